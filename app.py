@@ -1138,13 +1138,13 @@ def get_cinematic_view_state(phase):
 # ─── Session State ──────────────────────────────────────────────────────────
 def init_state():
     defaults = {
-        "terrain_df": None, "risk_df": None,
+        "terrain_df": None, "risk_df": None, "risk_updater": None,
         "powerlines_df": None, "substations_df": None,
         "facilities_df": None, "wind_df": None,
         "disabled_lines": set(),
         "nemotron_connected": False, "nemotron_engine": None,
         "prevention_brief": None, "counterfactual_explanation": None,
-        "shutoff_plans": None, "data_loaded": False, "selected_plan": None,
+        "shutoff_plans": None, "pareto_frontier": None, "psps_schedule": None, "data_loaded": False, "selected_plan": None,
         "show_fire_spread": True, "show_wind": True, "show_risk_columns": True,
         "demo_mode": True, "demo_phase": 0,
         "interactive_mode": False,
@@ -1186,11 +1186,35 @@ def _prewarm_prevention_brief():
         st.session_state._brief_prewarm_result = None
 
 
+# ─── Shared Terrain & Grid Optimizer ───────────────────────────────────────
+@st.cache_resource
+def get_terrain_grid():
+    """Read-only terrain, mapped once per process and shared by every session."""
+    from data_generator import load_terrain_grid
+    return load_terrain_grid()
+
+
+@st.cache_resource
+def get_grid_optimizer():
+    """One GridOptimizer per process; it memoizes line scores and plans."""
+    from grid_optimizer import GridOptimizer
+    return GridOptimizer(terrain_df=get_terrain_grid())
+
+
+def with_risk_columns(terrain: pd.DataFrame, risk_columns: pd.DataFrame) -> pd.DataFrame:
+    """Shallow terrain frame plus private copies of the risk columns."""
+    frame = terrain.copy(deep=False)
+    for col in risk_columns.columns:
+        frame[col] = risk_columns[col].to_numpy(copy=True)
+    return frame
+
+
 # ─── Load Data (with error boundary) ───────────────────────────────────────
 @st.cache_data
 def load_all_data():
+    """Everything but the terrain itself, which st.cache_data would pickle and copy."""
     from data_generator import (
-        generate_terrain_grid, generate_weather_timeline,
+        generate_weather_timeline,
         get_substation_df, get_power_lines_df,
         get_critical_facilities_df, compute_powerline_proximity,
         generate_wind_field,
@@ -1198,7 +1222,7 @@ def load_all_data():
     from risk_engine import compute_ignition_risk
     from config import WEATHER
 
-    terrain = generate_terrain_grid()
+    terrain = get_terrain_grid()
     powerlines = get_power_lines_df()
     substations = get_substation_df()
     facilities = get_critical_facilities_df()
@@ -1206,15 +1230,18 @@ def load_all_data():
     risk_terrain = compute_ignition_risk(terrain, proximity, WEATHER)
     wind = generate_wind_field(risk_terrain)
     weather_timeline = generate_weather_timeline()
+    risk_columns = risk_terrain.drop(columns=terrain.columns)
 
-    return risk_terrain, powerlines, substations, facilities, wind, weather_timeline, proximity
+    return risk_columns, powerlines, substations, facilities, wind, weather_timeline, proximity
 
 
 try:
     if not st.session_state.data_loaded:
-        risk_terrain, powerlines, substations, facilities, wind, weather_timeline, proximity = load_all_data()
-        st.session_state.terrain_df = risk_terrain
-        st.session_state.risk_df = risk_terrain.copy()
+        risk_columns, powerlines, substations, facilities, wind, weather_timeline, proximity = load_all_data()
+        terrain = get_terrain_grid()
+        # risk_df is patched in place (IncrementalRiskUpdater), so it gets its own risk columns
+        st.session_state.terrain_df = with_risk_columns(terrain, risk_columns)
+        st.session_state.risk_df = with_risk_columns(terrain, risk_columns)
         st.session_state.powerlines_df = powerlines
         st.session_state.substations_df = substations
         st.session_state.facilities_df = facilities
@@ -1467,12 +1494,14 @@ if st.session_state.interactive_mode:
 # ═══════════════════════════════════════════════════════════════════════════
 # STAT OVERVIEW ROW
 # ═══════════════════════════════════════════════════════════════════════════
+from risk_engine import summarize_risk, combine_risk_summaries
 risk_df = st.session_state.risk_df
-extreme = int((risk_df["ignition_risk"] > 0.75).sum())
-high = int(((risk_df["ignition_risk"] > 0.55) & (risk_df["ignition_risk"] <= 0.75)).sum())
-moderate = int(((risk_df["ignition_risk"] > 0.3) & (risk_df["ignition_risk"] <= 0.55)).sum())
-low = int((risk_df["ignition_risk"] <= 0.3).sum())
-mean_risk = risk_df["ignition_risk"].mean()
+risk_summary = combine_risk_summaries([summarize_risk(risk_df["ignition_risk"].to_numpy())])
+extreme = risk_summary["extreme_cells"]
+high = risk_summary["high_cells"]
+moderate = risk_summary["moderate_cells"]
+low = risk_summary["low_cells"]
+mean_risk = risk_summary["mean_risk"]
 
 st.markdown(f"""
 <div class="stat-grid">
@@ -1553,6 +1582,7 @@ if st.session_state.interactive_mode:
                     ignition_lat=max_risk_point["lat"],
                     ignition_lon=max_risk_point["lon"],
                     hours_list=[3, 6, 12, 24],
+                    terrain_df=st.session_state.terrain_df,
                 )
 
             from visualization import build_full_3d_map
@@ -1623,19 +1653,23 @@ if st.session_state.interactive_mode:
                     new_disabled.add(pl["id"])
 
             if new_disabled != st.session_state.disabled_lines:
-                st.session_state.disabled_lines = new_disabled
                 try:
-                    from data_generator import compute_powerline_proximity, get_power_lines_df
-                    from risk_engine import compute_ignition_risk
-                    updated_pl = get_power_lines_df()
-                    updated_pl["active"] = ~updated_pl["id"].isin(new_disabled)
-                    new_proximity = compute_powerline_proximity(
-                        st.session_state.terrain_df,
-                        updated_pl[updated_pl["active"]],
-                    )
-                    new_risk = compute_ignition_risk(st.session_state.terrain_df, new_proximity)
-                    st.session_state.risk_df = new_risk
+                    from data_generator import get_proximity_basis
+                    from risk_engine import IncrementalRiskUpdater
+                    basis = get_proximity_basis(st.session_state.terrain_df, st.session_state.powerlines_df)
+                    updater = st.session_state.risk_updater
+                    if (updater is None or updater.df is not st.session_state.risk_df
+                            or updater.basis is not basis):
+                        # risk_df was replaced elsewhere — rebind to its current line state
+                        updater = IncrementalRiskUpdater(
+                            st.session_state.risk_df, basis, WEATHER,
+                            set(basis.line_ids) - st.session_state.disabled_lines,
+                        )
+                        st.session_state.risk_updater = updater
+                    st.session_state.disabled_lines = new_disabled
+                    updater.update(new_disabled)
                 except Exception as e:
+                    st.session_state.disabled_lines = new_disabled
                     st.warning(f"Risk recomputation error: {str(e)[:100]}")
 
         with col_right:
@@ -1643,8 +1677,7 @@ if st.session_state.interactive_mode:
             st.markdown('<div style="font-size:0.75rem; color:var(--text-secondary);">GPU graph optimization finds optimal combinations minimizing fire risk while preserving critical loads.</div>', unsafe_allow_html=True)
 
             try:
-                from grid_optimizer import GridOptimizer
-                optimizer = GridOptimizer()
+                optimizer = get_grid_optimizer()
             except Exception as e:
                 st.markdown(f'<div class="error-card"><div class="error-title">Grid Optimizer Error</div>{html_module.escape(str(e)[:100])}</div>', unsafe_allow_html=True)
                 optimizer = None
@@ -1652,6 +1685,7 @@ if st.session_state.interactive_mode:
             if optimizer:
                 protect_critical = st.checkbox("🏥 Protect critical facilities", value=True, key="iprotect")
                 max_shutoffs = st.slider("Max lines to disable", 1, 5, 3, key="imax")
+                screen_overloads = st.checkbox("⚡ Screen line overloads (DC power flow)", value=False, key="iscreen")
 
                 if st.button("🧠 COMPUTE OPTIMAL PLANS", use_container_width=True):
                     with st.spinner("Running GPU-accelerated graph optimization..."):
@@ -1660,7 +1694,12 @@ if st.session_state.interactive_mode:
                                 weather=WEATHER,
                                 max_shutoffs=max_shutoffs,
                                 protect_critical=protect_critical,
+                                screen_overloads=screen_overloads,
                             )
+                            from data_generator import get_proximity_basis
+                            from risk_engine import annotate_plans_with_terrain_risk
+                            basis = get_proximity_basis(st.session_state.terrain_df, st.session_state.powerlines_df)
+                            plans = annotate_plans_with_terrain_risk(plans, st.session_state.terrain_df, basis, WEATHER)
                             st.session_state.shutoff_plans = plans
                         except Exception as e:
                             st.error(f"Optimization failed: {str(e)[:100]}")
@@ -1679,6 +1718,8 @@ if st.session_state.interactive_mode:
                             <div class="plan-detail"><strong>Lines:</strong> {', '.join(plan['line_names'])}</div>
                             <div class="plan-detail"><strong>Risk removed:</strong> {plan['total_risk_removed']:.4f} | <strong>Confidence:</strong> {plan['confidence']:.0%}</div>
                             <div class="plan-detail"><strong>Grid connected:</strong> {'✅' if plan['grid_connected'] else '❌'} | <strong>Facilities impacted:</strong> {plan['critical_facilities_impacted']}</div>
+                            <div class="plan-detail"><strong>Terrain risk:</strong> -{plan.get('terrain_risk_reduction_pct', 0):.2f}% | <strong>Extreme cells eliminated:</strong> {plan.get('extreme_cells_eliminated', 0)}</div>
+                            {f'<div class="plan-detail"><strong>Peak line loading:</strong> {plan["max_line_loading"]:.0%}</div>' if 'max_line_loading' in plan else ''}
                         </div>
                         """, unsafe_allow_html=True)
 
@@ -1687,6 +1728,69 @@ if st.session_state.interactive_mode:
                             st.session_state.selected_plan = plan
                             st.rerun()
 
+                with st.expander("📈 Pareto frontier (risk vs. customers vs. facilities vs. fragmentation)"):
+                    if st.button("Compute frontier", use_container_width=True, key="ifrontier"):
+                        try:
+                            st.session_state.pareto_frontier = optimizer.compute_pareto_frontier(
+                                weather=WEATHER,
+                                max_shutoffs=max_shutoffs,
+                                protect_critical=protect_critical,
+                            )
+                        except Exception as e:
+                            st.error(f"Frontier computation failed: {str(e)[:100]}")
+
+                    frontier = st.session_state.pareto_frontier
+                    if frontier is not None and len(frontier):
+                        n_pages = (len(frontier) - 1) // 10 + 1
+                        page = st.number_input(f"Page (of {n_pages})", 1, n_pages, 1, key="ifrontier_page") - 1
+                        st.dataframe(pd.DataFrame([{
+                            "#": p["rank"],
+                            "Lines": ", ".join(p["line_names"]),
+                            "Risk removed": p["total_risk_removed"],
+                            "Customers": p["customers_affected"],
+                            "Critical": p["critical_facilities_impacted"],
+                            "Islands": p["num_components"],
+                        } for p in frontier.page(page)]), hide_index=True, use_container_width=True)
+
+                with st.expander("🗓️ 72-hour PSPS schedule (de-energization windows)"):
+                    max_switches = st.slider("Max switching operations per hour", 1, 3, 2, key="ipsps_switches")
+                    if st.button("Compute schedule", use_container_width=True, key="ipsps"):
+                        try:
+                            from psps_scheduler import optimize_psps_schedule
+                            st.session_state.psps_schedule = optimize_psps_schedule(
+                                st.session_state.weather_timeline,
+                                optimizer,
+                                max_shutoffs=max_shutoffs,
+                                protect_critical=protect_critical,
+                                max_switches_per_hour=max_switches,
+                            )
+                        except Exception as e:
+                            st.error(f"Schedule optimization failed: {str(e)[:100]}")
+
+                    schedule = st.session_state.psps_schedule
+                    if schedule is not None:
+                        totals = schedule["totals"]
+                        ps1, ps2, ps3 = st.columns(3)
+                        with ps1:
+                            st.metric(
+                                "Risk-hours", f"{totals['risk_hours']:.2f}",
+                                f"{totals['risk_hours'] - totals['baseline_risk_hours']:.2f}", delta_color="inverse",
+                            )
+                        with ps2:
+                            st.metric("Customer-hours out", f"{totals['customer_outage_hours']:,}")
+                        with ps3:
+                            st.metric("Switching ops", totals["switches"])
+                        if schedule["windows"]:
+                            st.dataframe(pd.DataFrame([{
+                                "Line": w["line_name"],
+                                "Off from (h)": w["start_hour"],
+                                "Restore at (h)": w["end_hour"],
+                                "Hours": w["hours"],
+                                "Customers": w["customers"],
+                            } for w in schedule["windows"]]), hide_index=True, use_container_width=True)
+                        else:
+                            st.caption("No line exceeds the risk threshold enough to justify a shutoff.")
+
         if st.session_state.disabled_lines and optimizer:
             st.markdown("---")
             st.markdown("""
@@ -1707,6 +1811,19 @@ if st.session_state.interactive_mode:
                     st.metric("Facilities Impacted", len(affected))
                 with ia4:
                     st.metric("Lines Disabled", len(st.session_state.disabled_lines))
+
+                contingencies = optimizer.analyze_contingencies(st.session_state.disabled_lines, depth=2)
+                n1, n2 = contingencies["n1"], contingencies["n2"]
+                ct1, ct2, ct3 = st.columns(3)
+                with ct1:
+                    st.metric("N-1 Worst Components", n1["worst_components"])
+                with ct2:
+                    st.metric("N-1 Worst Facility Loss", n1["worst_facilities_lost"])
+                with ct3:
+                    st.metric("N-2 Worst Facility Loss", n2["worst_facilities_lost"])
+                if n1["contingencies"]:
+                    worst = n1["contingencies"][0]
+                    st.markdown(f'<div style="font-size:0.75rem; color:var(--text-secondary);">Most critical single trip: <strong>{", ".join(worst["lines"])}</strong> → {worst["facilities_lost"]} more facilities lose power</div>', unsafe_allow_html=True)
             except Exception:
                 st.warning("Could not compute impact assessment.")
 
@@ -1734,8 +1851,7 @@ if st.session_state.interactive_mode:
                             "high_cells": high,
                             "total_cells": len(risk_df),
                         }
-                        from grid_optimizer import GridOptimizer
-                        opt = GridOptimizer()
+                        opt = get_grid_optimizer()
                         affected = opt.get_affected_facilities(st.session_state.disabled_lines)
                         brief = st.session_state.nemotron_engine.generate_prevention_brief(
                             weather=WEATHER,
@@ -1765,8 +1881,7 @@ if st.session_state.interactive_mode:
         """, unsafe_allow_html=True)
 
         try:
-            from grid_optimizer import GridOptimizer
-            cf_optimizer = GridOptimizer()
+            cf_optimizer = get_grid_optimizer()
         except Exception:
             cf_optimizer = None
 
@@ -1791,10 +1906,10 @@ if st.session_state.interactive_mode:
             if st.button("🔄 Reset all lines", use_container_width=True, key="icf_reset"):
                 st.session_state.disabled_lines = set()
                 try:
-                    from data_generator import compute_powerline_proximity, get_power_lines_df
+                    from data_generator import get_proximity_basis
                     from risk_engine import compute_ignition_risk
-                    powerlines = get_power_lines_df()
-                    proximity = compute_powerline_proximity(st.session_state.terrain_df, powerlines)
+                    basis = get_proximity_basis(st.session_state.terrain_df, st.session_state.powerlines_df)
+                    proximity = basis.proximity_for(basis.line_ids)
                     st.session_state.risk_df = compute_ignition_risk(st.session_state.terrain_df, proximity)
                 except Exception:
                     pass
@@ -1802,11 +1917,11 @@ if st.session_state.interactive_mode:
 
         if st.session_state.disabled_lines:
             try:
-                from data_generator import compute_powerline_proximity, get_power_lines_df
+                from data_generator import get_proximity_basis
                 from risk_engine import compute_ignition_risk, compute_risk_reduction
 
-                all_pl = get_power_lines_df()
-                orig_proximity = compute_powerline_proximity(st.session_state.terrain_df, all_pl)
+                basis = get_proximity_basis(st.session_state.terrain_df, st.session_state.powerlines_df)
+                orig_proximity = basis.proximity_for(basis.line_ids)
                 orig_risk = compute_ignition_risk(st.session_state.terrain_df, orig_proximity)
                 current_risk = st.session_state.risk_df
                 reduction = compute_risk_reduction(st.session_state.terrain_df, orig_risk, current_risk)
@@ -1886,6 +2001,18 @@ if st.session_state.interactive_mode:
                 st.markdown("##### Humidity (%)")
                 st.line_chart(wx_data.set_index("hour")["humidity_pct"], color="#00b4d8", height=200)
 
+            from data_generator import get_proximity_basis
+            from risk_engine import compute_risk_timeseries
+            basis = get_proximity_basis(st.session_state.terrain_df, st.session_state.powerlines_df)
+            _, risk_hourly = compute_risk_timeseries(
+                st.session_state.terrain_df,
+                wx_data,
+                basis.proximity_for(set(basis.line_ids) - st.session_state.disabled_lines),
+            )
+            st.markdown("##### Extreme Ignition Risk Cells")
+            st.area_chart(risk_hourly.set_index("hour")["extreme_cells"], color="#ff3b3b", height=200)
+            peak_risk = risk_hourly.loc[risk_hourly["mean_risk"].idxmax()]
+
             peak = wx_data.loc[wx_data["wind_speed_mph"].idxmax()]
             st.markdown(f"""
             <div class="stat-grid">
@@ -1906,6 +2033,11 @@ if st.session_state.interactive_mode:
                     <div class="stat-label">Max Temperature</div>
                     <div class="stat-value orange">{wx_data['temperature_f'].max():.0f}<span style="font-size:0.9rem;">°F</span></div>
                 </div>
+                <div class="stat-card red">
+                    <div class="stat-label">Peak Risk Hour</div>
+                    <div class="stat-value red">{peak_risk['mean_risk']:.3f}</div>
+                    <div class="stat-delta" style="color:var(--text-secondary);">Hour {int(peak_risk['hour'])} · {int(peak_risk['extreme_cells'])} extreme cells</div>
+                </div>
             </div>
             """, unsafe_allow_html=True)
         except Exception as e:
@@ -2120,6 +2252,7 @@ else:
                 ignition_lat=max_risk_point["lat"],
                 ignition_lon=max_risk_point["lon"],
                 hours_list=[3, 6, 12, 24],
+                terrain_df=st.session_state.terrain_df,
             )
 
             from visualization import build_full_3d_map
@@ -2173,15 +2306,17 @@ else:
         """, unsafe_allow_html=True)
 
         try:
-            from grid_optimizer import GridOptimizer
-            optimizer = GridOptimizer()
+            optimizer = get_grid_optimizer()
             line_risks = optimizer.compute_line_risk_scores(WEATHER)
+            corridors = optimizer.compute_corridor_risk(WEATHER)
 
             pl_df = st.session_state.powerlines_df
             table_rows = ""
             for _, pl in pl_df.iterrows():
                 score = line_risks.get(pl["id"], 0)
                 veg = pl["vegetation_risk"]
+                corridor = corridors.get(pl["id"])
+                corridor_cell = f"{corridor['max']:.2f} / {corridor['p90']:.2f}" if corridor else "—"
                 if score > 0.7:
                     badge = '<span class="risk-badge extreme">EXTREME</span>'
                 elif score > 0.5:
@@ -2190,12 +2325,12 @@ else:
                     badge = '<span class="risk-badge moderate">MODERATE</span>'
                 else:
                     badge = '<span class="risk-badge low">LOW</span>'
-                table_rows += f"<tr><td>{pl['name']}</td><td>{pl['voltage_kv']}kV</td><td>{veg:.0%}</td><td>{score:.2f}</td><td>{badge}</td></tr>"
+                table_rows += f"<tr><td>{pl['name']}</td><td>{pl['voltage_kv']}kV</td><td>{veg:.0%}</td><td>{corridor_cell}</td><td>{score:.2f}</td><td>{badge}</td></tr>"
 
             st.markdown(f"""
             <div class="glass-card">
                 <table class="data-table">
-                    <thead><tr><th>Line</th><th>Voltage</th><th>Veg Risk</th><th>Score</th><th>Status</th></tr></thead>
+                    <thead><tr><th>Line</th><th>Voltage</th><th>Veg Risk</th><th>Corridor Max / P90</th><th>Score</th><th>Status</th></tr></thead>
                     <tbody>{table_rows}</tbody>
                 </table>
             </div>
@@ -2206,13 +2341,13 @@ else:
             for _, cf in cf_df.iterrows():
                 from config import FACILITY_ICONS
                 icon = FACILITY_ICONS.get(cf["type"], "📍")
-                fac_rows += f"<tr><td>{icon} {cf['name']}</td><td>{cf['type'].upper()}</td><td>P{cf['priority']}</td><td>{cf['feeder']}</td></tr>"
+                fac_rows += f"<tr><td>{icon} {cf['name']}</td><td>{cf['type'].upper()}</td><td>P{cf['priority']}</td><td>{cf['substation']}</td></tr>"
 
             st.markdown(f"""
             <div class="glass-card" style="margin-top:16px;">
                 <div style="font-size:0.8rem; font-weight:600; color:var(--accent); margin-bottom:12px;">Critical Facilities</div>
                 <table class="data-table">
-                    <thead><tr><th>Facility</th><th>Type</th><th>Priority</th><th>Feeder</th></tr></thead>
+                    <thead><tr><th>Facility</th><th>Type</th><th>Priority</th><th>Substation</th></tr></thead>
                     <tbody>{fac_rows}</tbody>
                 </table>
             </div>
@@ -2241,12 +2376,15 @@ else:
         """, unsafe_allow_html=True)
 
         try:
-            from grid_optimizer import GridOptimizer
-            optimizer = GridOptimizer()
+            optimizer = get_grid_optimizer()
 
             if not st.session_state.shutoff_plans:
                 with st.spinner("Running GPU-accelerated graph optimization..."):
                     plans = optimizer.optimize_shutoffs(weather=WEATHER, max_shutoffs=3, protect_critical=True)
+                    from data_generator import get_proximity_basis
+                    from risk_engine import annotate_plans_with_terrain_risk
+                    basis = get_proximity_basis(st.session_state.terrain_df, st.session_state.powerlines_df)
+                    plans = annotate_plans_with_terrain_risk(plans, st.session_state.terrain_df, basis, WEATHER)
                     st.session_state.shutoff_plans = plans
 
             if st.session_state.shutoff_plans:
@@ -2263,6 +2401,7 @@ else:
                         <div class="plan-detail"><strong>Lines:</strong> {', '.join(plan['line_names'])}</div>
                         <div class="plan-detail"><strong>Risk removed:</strong> {plan['total_risk_removed']:.4f} | <strong>Confidence:</strong> {plan['confidence']:.0%}</div>
                         <div class="plan-detail"><strong>Grid connected:</strong> {'✅' if plan['grid_connected'] else '❌'} | <strong>Facilities impacted:</strong> {plan['critical_facilities_impacted']}</div>
+                        <div class="plan-detail"><strong>Terrain risk:</strong> -{plan.get('terrain_risk_reduction_pct', 0):.2f}% | <strong>Extreme cells eliminated:</strong> {plan.get('extreme_cells_eliminated', 0)}</div>
                     </div>
                     """, unsafe_allow_html=True)
 
@@ -2270,11 +2409,10 @@ else:
                     top = st.session_state.shutoff_plans[0]
                     st.session_state.disabled_lines = set(top['lines_disabled'])
                     st.session_state.selected_plan = top
-                    from data_generator import compute_powerline_proximity, get_power_lines_df
+                    from data_generator import get_proximity_basis
                     from risk_engine import compute_ignition_risk
-                    updated_pl = get_power_lines_df()
-                    updated_pl["active"] = ~updated_pl["id"].isin(st.session_state.disabled_lines)
-                    new_proximity = compute_powerline_proximity(st.session_state.terrain_df, updated_pl[updated_pl["active"]])
+                    basis = get_proximity_basis(st.session_state.terrain_df, st.session_state.powerlines_df)
+                    new_proximity = basis.proximity_for(set(basis.line_ids) - st.session_state.disabled_lines)
                     st.session_state.risk_df = compute_ignition_risk(st.session_state.terrain_df, new_proximity)
                     st.rerun()
         except Exception as e:
@@ -2297,19 +2435,18 @@ else:
                 top = st.session_state.shutoff_plans[0]
                 st.session_state.disabled_lines = set(top['lines_disabled'])
                 st.session_state.selected_plan = top
-                from data_generator import compute_powerline_proximity, get_power_lines_df
+                from data_generator import get_proximity_basis
                 from risk_engine import compute_ignition_risk
-                updated_pl = get_power_lines_df()
-                updated_pl["active"] = ~updated_pl["id"].isin(st.session_state.disabled_lines)
-                new_proximity = compute_powerline_proximity(st.session_state.terrain_df, updated_pl[updated_pl["active"]])
+                basis = get_proximity_basis(st.session_state.terrain_df, st.session_state.powerlines_df)
+                new_proximity = basis.proximity_for(set(basis.line_ids) - st.session_state.disabled_lines)
                 st.session_state.risk_df = compute_ignition_risk(st.session_state.terrain_df, new_proximity)
 
             if st.session_state.disabled_lines:
-                from data_generator import compute_powerline_proximity, get_power_lines_df
+                from data_generator import get_proximity_basis
                 from risk_engine import compute_ignition_risk, compute_risk_reduction
 
-                all_pl = get_power_lines_df()
-                orig_proximity = compute_powerline_proximity(st.session_state.terrain_df, all_pl)
+                basis = get_proximity_basis(st.session_state.terrain_df, st.session_state.powerlines_df)
+                orig_proximity = basis.proximity_for(basis.line_ids)
                 orig_risk = compute_ignition_risk(st.session_state.terrain_df, orig_proximity)
                 reduction = compute_risk_reduction(st.session_state.terrain_df, orig_risk, st.session_state.risk_df)
 
@@ -2394,8 +2531,7 @@ else:
                                 "high_cells": high,
                                 "total_cells": len(risk_df),
                             }
-                            from grid_optimizer import GridOptimizer
-                            optimizer = GridOptimizer()
+                            optimizer = get_grid_optimizer()
                             affected = optimizer.get_affected_facilities(st.session_state.disabled_lines)
                             brief = st.session_state.nemotron_engine.generate_prevention_brief(
                                 weather=WEATHER,
@@ -2467,10 +2603,10 @@ else:
                 st.session_state._brief_prewarm_started = False
                 st.session_state._brief_prewarm_result = None
                 try:
-                    from data_generator import compute_powerline_proximity, get_power_lines_df
+                    from data_generator import get_proximity_basis
                     from risk_engine import compute_ignition_risk
-                    plines = get_power_lines_df()
-                    prox = compute_powerline_proximity(st.session_state.terrain_df, plines)
+                    basis = get_proximity_basis(st.session_state.terrain_df, st.session_state.powerlines_df)
+                    prox = basis.proximity_for(basis.line_ids)
                     st.session_state.risk_df = compute_ignition_risk(st.session_state.terrain_df, prox)
                 except Exception:
                     pass
@@ -3,6 +3,8 @@ EarthDial v3 — Configuration & Constants
 Scenario: Sonoma County, California — Red Flag Warning
 """
 
+import os
+
 # ─── Scenario Center (Sonoma County, CA) ────────────────────────────────────
 CENTER_LAT = 38.52
 CENTER_LON = -122.82
@@ -16,6 +18,12 @@ GRID_COLS = 40
 GRID_STEP_LAT = 0.005   # ~550 m per step
 GRID_STEP_LON = 0.006
 
+# ─── Terrain Store (one read-only .npy memmap per column) ──────────────────
+TERRAIN_STORE_DIR = os.environ.get(
+    "EARTHDIAL_TERRAIN_STORE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".terrain_store"),
+)
+
 # ─── Weather Scenario: Red Flag Warning ─────────────────────────────────────
 WEATHER = {
     "wind_speed_mph": 45,
@@ -39,35 +47,40 @@ RISK_WEIGHTS = {
 }
 
 # ─── Power Grid ─────────────────────────────────────────────────────────────
+# "source" substations take bulk supply from transmission; the rest are fed
+# through the lines below. load_mw is the peak demand served at each one and
+# rating_mw is each line's thermal limit (used by power_flow).
 SUBSTATIONS = [
-    {"id": "SUB-01", "name": "Sonoma Valley Substation",   "lat": 38.505, "lon": -122.84, "capacity_mw": 120},
-    {"id": "SUB-02", "name": "Bennett Ridge Substation",   "lat": 38.545, "lon": -122.78, "capacity_mw": 85},
-    {"id": "SUB-03", "name": "Mark West Substation",       "lat": 38.530, "lon": -122.73, "capacity_mw": 150},
-    {"id": "SUB-04", "name": "Glen Ellen Substation",      "lat": 38.490, "lon": -122.86, "capacity_mw": 60},
-    {"id": "SUB-05", "name": "Kenwood Substation",         "lat": 38.560, "lon": -122.70, "capacity_mw": 95},
+    {"id": "SUB-01", "name": "Sonoma Valley Substation",   "lat": 38.505, "lon": -122.84, "capacity_mw": 120, "load_mw": 40, "source": True},
+    {"id": "SUB-02", "name": "Bennett Ridge Substation",   "lat": 38.545, "lon": -122.78, "capacity_mw": 85,  "load_mw": 45, "source": False},
+    {"id": "SUB-03", "name": "Mark West Substation",       "lat": 38.530, "lon": -122.73, "capacity_mw": 150, "load_mw": 50, "source": True},
+    {"id": "SUB-04", "name": "Glen Ellen Substation",      "lat": 38.490, "lon": -122.86, "capacity_mw": 60,  "load_mw": 30, "source": False},
+    {"id": "SUB-05", "name": "Kenwood Substation",         "lat": 38.560, "lon": -122.70, "capacity_mw": 95,  "load_mw": 55, "source": False},
 ]
 
 POWER_LINES = [
-    {"id": "PL-01", "name": "Bennett-Mark West 115kV",       "from": "SUB-02", "to": "SUB-03", "voltage_kv": 115, "vegetation_risk": 0.85, "age_years": 42},
-    {"id": "PL-02", "name": "Sonoma-Glen Ellen 60kV",        "from": "SUB-01", "to": "SUB-04", "voltage_kv": 60,  "vegetation_risk": 0.45, "age_years": 28},
-    {"id": "PL-03", "name": "Glen Ellen-Bennett 60kV",       "from": "SUB-04", "to": "SUB-02", "voltage_kv": 60,  "vegetation_risk": 0.72, "age_years": 35},
-    {"id": "PL-04", "name": "Mark West-Kenwood 115kV",       "from": "SUB-03", "to": "SUB-05", "voltage_kv": 115, "vegetation_risk": 0.90, "age_years": 38},
-    {"id": "PL-05", "name": "Sonoma-Bennett Ridge 115kV",    "from": "SUB-01", "to": "SUB-02", "voltage_kv": 115, "vegetation_risk": 0.60, "age_years": 25},
-    {"id": "PL-06", "name": "Kenwood-Bennett 60kV",          "from": "SUB-05", "to": "SUB-02", "voltage_kv": 60,  "vegetation_risk": 0.78, "age_years": 51},
-    {"id": "PL-07", "name": "Sonoma-Kenwood Trunk 230kV",    "from": "SUB-01", "to": "SUB-05", "voltage_kv": 230, "vegetation_risk": 0.55, "age_years": 18},
-    {"id": "PL-08", "name": "Glen Ellen-Kenwood Feeder 60kV","from": "SUB-04", "to": "SUB-05", "voltage_kv": 60,  "vegetation_risk": 0.82, "age_years": 45},
+    {"id": "PL-01", "name": "Bennett-Mark West 115kV",       "from": "SUB-02", "to": "SUB-03", "voltage_kv": 115, "vegetation_risk": 0.85, "age_years": 42, "customers": 6200, "rating_mw": 75},
+    {"id": "PL-02", "name": "Sonoma-Glen Ellen 60kV",        "from": "SUB-01", "to": "SUB-04", "voltage_kv": 60,  "vegetation_risk": 0.45, "age_years": 28, "customers": 3400, "rating_mw": 45},
+    {"id": "PL-03", "name": "Glen Ellen-Bennett 60kV",       "from": "SUB-04", "to": "SUB-02", "voltage_kv": 60,  "vegetation_risk": 0.72, "age_years": 35, "customers": 2100, "rating_mw": 45},
+    {"id": "PL-04", "name": "Mark West-Kenwood 115kV",       "from": "SUB-03", "to": "SUB-05", "voltage_kv": 115, "vegetation_risk": 0.90, "age_years": 38, "customers": 5800, "rating_mw": 75},
+    {"id": "PL-05", "name": "Sonoma-Bennett Ridge 115kV",    "from": "SUB-01", "to": "SUB-02", "voltage_kv": 115, "vegetation_risk": 0.60, "age_years": 25, "customers": 7400, "rating_mw": 75},
+    {"id": "PL-06", "name": "Kenwood-Bennett 60kV",          "from": "SUB-05", "to": "SUB-02", "voltage_kv": 60,  "vegetation_risk": 0.78, "age_years": 51, "customers": 1900, "rating_mw": 45},
+    {"id": "PL-07", "name": "Sonoma-Kenwood Trunk 230kV",    "from": "SUB-01", "to": "SUB-05", "voltage_kv": 230, "vegetation_risk": 0.55, "age_years": 18, "customers": 12500, "rating_mw": 150},
+    {"id": "PL-08", "name": "Glen Ellen-Kenwood Feeder 60kV","from": "SUB-04", "to": "SUB-05", "voltage_kv": 60,  "vegetation_risk": 0.82, "age_years": 45, "customers": 1600, "rating_mw": 45},
 ]
 
 # ─── Critical Facilities ───────────────────────────────────────────────────
+# Each facility is served from one substation; it loses power when no path of
+# energized lines connects that substation to a source.
 CRITICAL_FACILITIES = [
-    {"id": "CF-01", "name": "Sonoma Valley Hospital",           "type": "hospital",  "lat": 38.502, "lon": -122.835, "feeder": "PL-02", "priority": 1},
-    {"id": "CF-02", "name": "Mark West Emergency Shelter",      "type": "shelter",   "lat": 38.528, "lon": -122.74,  "feeder": "PL-01", "priority": 1},
-    {"id": "CF-03", "name": "Bennett Ridge Comm Tower",         "type": "comms",     "lat": 38.548, "lon": -122.79,  "feeder": "PL-01", "priority": 2},
-    {"id": "CF-04", "name": "Glen Ellen Water Pump Station",    "type": "water",     "lat": 38.488, "lon": -122.855, "feeder": "PL-02", "priority": 1},
-    {"id": "CF-05", "name": "Kenwood Fire Station",             "type": "fire_stn",  "lat": 38.558, "lon": -122.71,  "feeder": "PL-04", "priority": 1},
-    {"id": "CF-06", "name": "Sonoma County EOC",                "type": "eoc",       "lat": 38.510, "lon": -122.82,  "feeder": "PL-05", "priority": 1},
-    {"id": "CF-07", "name": "Highway 12 Traffic Control",       "type": "traffic",   "lat": 38.515, "lon": -122.78,  "feeder": "PL-05", "priority": 3},
-    {"id": "CF-08", "name": "Oakmont Senior Living",            "type": "shelter",   "lat": 38.540, "lon": -122.75,  "feeder": "PL-01", "priority": 1},
+    {"id": "CF-01", "name": "Sonoma Valley Hospital",           "type": "hospital",  "lat": 38.502, "lon": -122.835, "substation": "SUB-01", "priority": 1},
+    {"id": "CF-02", "name": "Mark West Emergency Shelter",      "type": "shelter",   "lat": 38.528, "lon": -122.74,  "substation": "SUB-03", "priority": 1},
+    {"id": "CF-03", "name": "Bennett Ridge Comm Tower",         "type": "comms",     "lat": 38.548, "lon": -122.79,  "substation": "SUB-02", "priority": 2},
+    {"id": "CF-04", "name": "Glen Ellen Water Pump Station",    "type": "water",     "lat": 38.488, "lon": -122.855, "substation": "SUB-04", "priority": 1},
+    {"id": "CF-05", "name": "Kenwood Fire Station",             "type": "fire_stn",  "lat": 38.558, "lon": -122.71,  "substation": "SUB-05", "priority": 1},
+    {"id": "CF-06", "name": "Sonoma County EOC",                "type": "eoc",       "lat": 38.510, "lon": -122.82,  "substation": "SUB-01", "priority": 1},
+    {"id": "CF-07", "name": "Highway 12 Traffic Control",       "type": "traffic",   "lat": 38.515, "lon": -122.78,  "substation": "SUB-02", "priority": 3},
+    {"id": "CF-08", "name": "Oakmont Senior Living",            "type": "shelter",   "lat": 38.540, "lon": -122.75,  "substation": "SUB-03", "priority": 1},
 ]
 
 # ─── Visualization ──────────────────────────────────────────────────────────
@@ -0,0 +1,323 @@
+"""
+EarthDial v3 — N-1 / N-k Contingency Screening
+Worst-case impact of one or two further line trips on top of a shutoff plan,
+from a single DFS over the post-plan grid instead of one traversal per case.
+"""
+
+import numpy as np
+
+NO_EDGE = -1
+
+
+class ContingencyAnalyzer:
+    """
+    Contingency screening for shutoff plans on a GridOptimizer's grid.
+
+    One iterative DFS over the post-plan grid yields bridges, articulation
+    points, subtree source/facility counts and random cycle-space labels on
+    the DFS tree. Every single trip is then O(1): only bridges split the
+    grid, and a bridge cuts off exactly its child's subtree. Double trips
+    split the grid when both lines are bridges, or when two non-bridges
+    share a cycle-space label (a 2-edge cut, whose separated side is the
+    difference of two nested subtrees). Those pairs are scored as arrays.
+    """
+
+    def __init__(self, optimizer, seed: int = 0):
+        self.optimizer = optimizer
+        self.seed = seed
+        self.nodes = list(optimizer.graph.nodes)
+        self.node_pos = {node: i for i, node in enumerate(self.nodes)}
+        self.line_ids = list(optimizer.edge_index)
+        self.ends = np.array(
+            [[self.node_pos[u], self.node_pos[v]] for u, v in optimizer.edge_index.values()],
+            dtype=np.int64,
+        ).reshape(-1, 2)
+
+        n_v = len(self.nodes)
+        self.is_source = np.zeros(n_v, dtype=np.int64)
+        for node in optimizer.sources:
+            if node in self.node_pos:
+                self.is_source[self.node_pos[node]] = 1
+        self.facilities = np.zeros(n_v, dtype=np.int64)
+        self.critical = np.zeros(n_v, dtype=np.int64)
+        for cf in optimizer.critical_facilities:
+            self.facilities[self.node_pos[cf["substation"]]] += 1
+            self.critical[self.node_pos[cf["substation"]]] += cf["priority"] == 1
+        self._intact = None  # see intact
+
+    def intact(self) -> dict:
+        """_dfs of the grid with every line in service, computed once and shared read-only."""
+        if self._intact is None:
+            self._intact = self._dfs(np.ones(len(self.line_ids), dtype=bool))
+        return self._intact
+
+    def _dfs(self, active: np.ndarray) -> dict:
+        """
+        Tarjan low-link DFS over the active lines (parallel lines allowed).
+
+        Returns:
+            Arrays indexed by node ('tin', 'tout', 'comp', subtree 'src' /
+            'fac' / 'crit' counts, 'parent_edge') and by line ('tree_child',
+            'bridge', 'label'), plus per-component totals and articulation points
+        """
+        n_v = len(self.nodes)
+        rng = np.random.default_rng(self.seed)
+        adj = [[] for _ in range(n_v)]
+        for e in np.flatnonzero(active):
+            u, v = self.ends[e]
+            adj[u].append((v, e))
+            adj[v].append((u, e))
+
+        tin = np.full(n_v, -1, dtype=np.int64)
+        tout = np.zeros(n_v, dtype=np.int64)
+        low = np.zeros(n_v, dtype=np.int64)
+        comp = np.zeros(n_v, dtype=np.int64)
+        parent_edge = np.full(n_v, NO_EDGE, dtype=np.int64)
+        src, fac, crit = self.is_source.copy(), self.facilities.copy(), self.critical.copy()
+        potential = np.zeros(n_v, dtype=np.uint64)
+        tree_child = np.full(len(self.line_ids), -1, dtype=np.int64)
+        label = np.zeros(len(self.line_ids), dtype=np.uint64)
+        articulation = set()
+
+        clock = 0
+        n_comp = 0
+        for root in range(n_v):
+            if tin[root] >= 0:
+                continue
+            tin[root] = low[root] = clock
+            clock += 1
+            comp[root] = n_comp
+            root_children = 0
+            stack = [(root, 0)]
+            while stack:
+                node, i = stack[-1]
+                if i < len(adj[node]):
+                    stack[-1] = (node, i + 1)
+                    nbr, e = adj[node][i]
+                    if e == parent_edge[node]:
+                        continue
+                    if tin[nbr] < 0:
+                        tin[nbr] = low[nbr] = clock
+                        clock += 1
+                        comp[nbr] = n_comp
+                        parent_edge[nbr] = e
+                        tree_child[e] = nbr
+                        root_children += node == root
+                        stack.append((nbr, 0))
+                    elif tin[nbr] < tin[node]:
+                        # Back edge: random label, XORed into both endpoints
+                        low[node] = min(low[node], tin[nbr])
+                        label[e] = rng.integers(1, 2**64, dtype=np.uint64)
+                        potential[node] ^= label[e]
+                        potential[nbr] ^= label[e]
+                    continue
+
+                stack.pop()
+                tout[node] = clock
+                if stack:
+                    parent = stack[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                    src[parent] += src[node]
+                    fac[parent] += fac[node]
+                    crit[parent] += crit[node]
+                    e = parent_edge[node]
+                    label[e] = potential[node]
+                    potential[parent] ^= potential[node]
+                    if parent != root and low[node] >= tin[parent]:
+                        articulation.add(parent)
+            if root_children > 1:
+                articulation.add(root)
+            n_comp += 1
+
+        roots = np.flatnonzero(parent_edge == NO_EDGE)
+        comp_src = np.zeros(n_comp, dtype=np.int64)
+        comp_fac = np.zeros(n_comp, dtype=np.int64)
+        comp_crit = np.zeros(n_comp, dtype=np.int64)
+        comp_src[comp[roots]] = src[roots]
+        comp_fac[comp[roots]] = fac[roots]
+        comp_crit[comp[roots]] = crit[roots]
+
+        tree = tree_child >= 0
+        bridge = np.zeros(len(self.line_ids), dtype=bool)
+        bridge[tree] = label[tree] == 0
+
+        return {
+            "tin": tin, "tout": tout, "comp": comp, "parent_edge": parent_edge,
+            "src": src, "fac": fac, "crit": crit,
+            "tree_child": tree_child, "bridge": bridge, "label": label,
+            "comp_src": comp_src, "comp_fac": comp_fac, "comp_crit": comp_crit,
+            "n_comp": n_comp, "articulation": sorted(articulation),
+        }
+
+    @staticmethod
+    def _pieces_loss(live, pieces):
+        """Facilities and critical facilities in pieces left without a source."""
+        fac = np.zeros(len(live), dtype=np.int64)
+        crit = np.zeros(len(live), dtype=np.int64)
+        for src, f, c in pieces:
+            dark = live & (src == 0)
+            fac += np.where(dark, f, 0)
+            crit += np.where(dark, c, 0)
+        return fac, crit
+
+    def _split_loss(self, d, comp, side):
+        """Loss when a component splits into `side` (src, fac, crit) and the rest."""
+        s, f, c = side
+        rest = (d["comp_src"][comp] - s, d["comp_fac"][comp] - f, d["comp_crit"][comp] - c)
+        return self._pieces_loss(d["comp_src"][comp] > 0, [side, rest])
+
+    def analyze(self, disabled_lines: set = (), depth: int = 1, limit: int = 10) -> dict:
+        """
+        Screen every additional single (and, with depth=2, double) line trip.
+
+        Args:
+            disabled_lines: The shutoff plan's line IDs
+            depth: 1 for N-1 only, 2 to add N-2
+            limit: Worst contingencies to list per depth
+
+        Returns:
+            Dict with the post-plan 'num_components' and 'facilities_lost',
+            'bridges', 'articulation_points', and per depth ('n1', 'n2') the
+            'worst_components', 'worst_facilities_lost',
+            'worst_critical_lost' and the worst 'contingencies' (each with
+            'lines', 'num_components', 'facilities_lost', 'critical_lost'
+            and 'affected_facilities')
+        """
+        disabled = set(disabled_lines)
+        active = np.array([pl_id not in disabled for pl_id in self.line_ids], dtype=bool)
+        d = self._dfs(active)
+        base_components = d["n_comp"]
+        dark = d["comp_src"][d["comp"]] == 0
+        base_lost = int(self.facilities[dark].sum())
+        single = self._single_trips(d)
+        bridges = single["pairs"][:, 0]
+
+        result = {
+            "plan": sorted(disabled),
+            "num_components": base_components,
+            "facilities_lost": base_lost,
+            "bridges": [self.line_ids[e] for e in bridges],
+            "articulation_points": [self.nodes[i] for i in d["articulation"]],
+            "n1": self._summarize(single, base_components, disabled, limit),
+            "n2": None,
+        }
+        if depth >= 2:
+            result["n2"] = self._summarize(
+                self._double_trips(d, single, int(active.sum())), base_components, disabled, limit,
+            )
+        return result
+
+    def single_trip_losses(self, disabled_lines: set = ()) -> dict:
+        """Facilities newly cut off by each further single trip, for every bridge."""
+        disabled = set(disabled_lines)
+        single = self._single_trips(self._dfs(np.array([pl_id not in disabled for pl_id in self.line_ids], dtype=bool)))
+        return {self.line_ids[e]: int(lost) for e, lost in zip(single["pairs"][:, 0], single["fac"])}
+
+    def _single_trips(self, d) -> dict:
+        """Scored single trips: only bridges split, cutting off the child's subtree."""
+        bridges = np.flatnonzero(d["bridge"])
+        child = d["tree_child"][bridges]
+        side = (d["src"][child], d["fac"][child], d["crit"][child])
+        fac, crit = self._split_loss(d, d["comp"][child], side)
+        return {
+            "pairs": bridges[:, None],
+            "added": np.ones(len(bridges), dtype=np.int64),
+            "fac": fac,
+            "crit": crit,
+        }
+
+    def _double_trips(self, d, single, n_active) -> dict:
+        """Scored line pairs that split the grid further than either line alone."""
+        tin, tout = d["tin"], d["tout"]
+        parts = []
+
+        # Bridge + bridge: three pieces (nested subtrees) or two cut-off subtrees
+        bridges = single["pairs"][:, 0]
+        if len(bridges) >= 2:
+            i, j = np.triu_indices(len(bridges), k=1)
+            a, b = d["tree_child"][bridges[i]], d["tree_child"][bridges[j]]
+            swap = tin[a] > tin[b]
+            a, b = np.where(swap, b, a), np.where(swap, a, b)
+            same = d["comp"][a] == d["comp"][b]
+            nested = same & (tin[b] < tout[a])
+            comp = d["comp"][a]
+            counts = [d["src"], d["fac"], d["crit"]]
+            sub_a = [x[a] for x in counts]
+            sub_b = [x[b] for x in counts]
+            totals = [d["comp_src"][comp], d["comp_fac"][comp], d["comp_crit"][comp]]
+            middle = [np.where(nested, xa - xb, xa) for xa, xb in zip(sub_a, sub_b)]
+            outer = [np.where(nested, t - xa, t - xa - xb) for t, xa, xb in zip(totals, sub_a, sub_b)]
+            fac, crit = self._pieces_loss(totals[0] > 0, [tuple(sub_b), tuple(middle), tuple(outer)])
+            # Bridges in different components split independently
+            apart = ~same
+            fac = np.where(apart, single["fac"][i] + single["fac"][j], fac)
+            crit = np.where(apart, single["crit"][i] + single["crit"][j], crit)
+            parts.append((np.column_stack([bridges[i], bridges[j]]), np.full(len(i), 2), fac, crit))
+
+        # Non-bridges sharing a cycle-space label form a 2-edge cut
+        label = d["label"]
+        candidates = np.flatnonzero((label != 0) & ~d["bridge"])
+        order = candidates[np.argsort(label[candidates], kind="stable")]
+        groups = [g for g in np.split(order, np.flatnonzero(label[order][1:] != label[order][:-1]) + 1) if len(g) > 1]
+        for group in groups:
+            i, j = np.triu_indices(len(group), k=1)
+            ea, eb = group[i], group[j]
+            ca, cb = d["tree_child"][ea], d["tree_child"][eb]
+            # A back edge in the pair: the side is the tree edge's subtree
+            both_tree = (ca >= 0) & (cb >= 0)
+            a = np.where(both_tree & (tin[np.maximum(ca, 0)] > tin[np.maximum(cb, 0)]), cb, ca)
+            b = np.where(both_tree & (tin[np.maximum(ca, 0)] > tin[np.maximum(cb, 0)]), ca, cb)
+            upper = np.where(a >= 0, a, b)
+            counts = [d["src"], d["fac"], d["crit"]]
+            side = tuple(
+                np.where(both_tree, x[np.maximum(a, 0)] - x[np.maximum(b, 0)], x[upper])
+                for x in counts
+            )
+            fac, crit = self._split_loss(d, d["comp"][upper], side)
+            parts.append((np.column_stack([ea, eb]), np.ones(len(i), dtype=np.int64), fac, crit))
+
+        # A bridge with any other line behaves like the bridge alone; these
+        # count toward the worst case but are not listed (second line = -1)
+        if n_active >= 2 and len(bridges):
+            pad = np.column_stack([bridges, np.full(len(bridges), NO_EDGE)])
+            parts.append((pad, single["added"], single["fac"], single["crit"]))
+
+        empty = np.zeros(0, dtype=np.int64)
+        return {
+            "pairs": np.concatenate([p[0] for p in parts]) if parts else np.zeros((0, 2), dtype=np.int64),
+            "added": np.concatenate([p[1] for p in parts]) if parts else empty,
+            "fac": np.concatenate([p[2] for p in parts]) if parts else empty,
+            "crit": np.concatenate([p[3] for p in parts]) if parts else empty,
+        }
+
+    def _summarize(self, scored, base_components, disabled, limit) -> dict:
+        """Worst-case figures plus the top contingencies with facility details."""
+        n = len(scored["added"])
+        if n == 0:
+            return {
+                "worst_components": base_components,
+                "worst_facilities_lost": 0,
+                "worst_critical_lost": 0,
+                "contingencies": [],
+            }
+        listed = (scored["pairs"] >= 0).all(axis=1)
+        worst = np.lexsort((-scored["added"], -scored["fac"], -scored["crit"]))
+        worst = worst[listed[worst]][:limit]
+        before = {cf["id"] for cf in self.optimizer.get_affected_facilities(disabled)}
+        contingencies = []
+        for r in worst:
+            lines = [self.line_ids[e] for e in scored["pairs"][r]]
+            after = self.optimizer.get_affected_facilities(disabled | set(lines))
+            contingencies.append({
+                "lines": lines,
+                "num_components": base_components + int(scored["added"][r]),
+                "facilities_lost": int(scored["fac"][r]),
+                "critical_lost": int(scored["crit"][r]),
+                "affected_facilities": [cf for cf in after if cf["id"] not in before],
+            })
+        return {
+            "worst_components": base_components + int(scored["added"].max()),
+            "worst_facilities_lost": int(scored["fac"].max()),
+            "worst_critical_lost": int(scored["crit"].max()),
+            "contingencies": contingencies,
+        }
@@ -3,62 +3,217 @@ EarthDial v3 — Synthetic Data Generator
 Generates realistic terrain, fuel, and weather data for Sonoma County scenario.
 """
 
+import hashlib
+import json
+import os
 import numpy as np
 import pandas as pd
 from config import (
     CENTER_LAT, CENTER_LON, GRID_ROWS, GRID_COLS,
-    GRID_STEP_LAT, GRID_STEP_LON, WEATHER,
+    GRID_STEP_LAT, GRID_STEP_LON, WEATHER, TERRAIN_STORE_DIR,
     SUBSTATIONS, POWER_LINES, CRITICAL_FACILITIES,
 )
 
 
-def generate_terrain_grid() -> pd.DataFrame:
+# Ridge/valley placement is defined on the original 40×40 layout and scaled
+# to the requested grid, so larger grids cover the same landscape at finer
+# resolution.
+_TERRAIN_REFERENCE_SIZE = 40
+
+
+def _synthesize_terrain(ii: np.ndarray, jj: np.ndarray, rows: int, cols: int) -> dict:
+    """
+    Terrain fields for cells at grid indices (ii, jj) of a rows × cols grid.
+
+    Draws noise from the global NumPy RNG, so callers seed it first.
+    Returns a dict of flat float64 arrays (unrounded).
+    """
+    n = ii.size
+    ri = ii * (_TERRAIN_REFERENCE_SIZE / rows)
+    rj = jj * (_TERRAIN_REFERENCE_SIZE / cols)
+
+    # Elevation: rolling hills with ridges (Sonoma Mountains)
+    base_elevation = 150  # meters
+    ridge_1 = 300 * np.exp(-((ri - 10)**2 + (rj - 30)**2) / 80)
+    ridge_2 = 250 * np.exp(-((ri - 30)**2 + (rj - 15)**2) / 60)
+    valley = -100 * np.exp(-((ri - 20)**2 + (rj - 20)**2) / 120)
+    noise = np.random.normal(0, 20, n)
+    elevation = np.maximum(30, base_elevation + ridge_1 + ridge_2 + valley + noise)
+
+    # Slope derived from elevation gradient (simplified)
+    slope = np.clip((ridge_1 + ridge_2) / 15 + np.random.normal(5, 3, n), 0, 45)
+
+    # Fuel density: higher on slopes, lower in valleys/developed areas
+    developed = np.exp(-((ri - 20)**2 + (rj - 20)**2) / 200)
+    fuel_density = np.clip(0.3 + 0.5 * (elevation / 500) - 0.4 * developed + np.random.normal(0, 0.1, n), 0.05, 1.0)
+
+    # Fuel moisture: very low during red flag (Diablo winds)
+    fuel_moisture = np.clip(0.06 + 0.04 * np.random.random(n) + 0.1 * (1 - fuel_density), 0.03, 0.25)
+
+    # Wind exposure: higher on ridges
+    wind_exposure = np.clip(0.3 + 0.7 * (elevation / 500) + np.random.normal(0, 0.05, n), 0.1, 1.0)
+
+    return {
+        "lat": CENTER_LAT - (rows / 2 - ii) * GRID_STEP_LAT,
+        "lon": CENTER_LON - (cols / 2 - jj) * GRID_STEP_LON,
+        "elevation": elevation,
+        "slope": slope,
+        "fuel_density": fuel_density,
+        "fuel_moisture": fuel_moisture,
+        "wind_exposure": wind_exposure,
+    }
+
+
+def _terrain_frame(fields: dict, ii: np.ndarray, jj: np.ndarray, dtype=np.float64) -> pd.DataFrame:
+    """Round synthesized fields to the published precision and assemble columns."""
+    return pd.DataFrame({
+        "lat": np.round(fields["lat"], 6),
+        "lon": np.round(fields["lon"], 6),
+        "elevation": np.round(fields["elevation"], 1).astype(dtype),
+        "slope": np.round(fields["slope"], 1).astype(dtype),
+        "fuel_density": np.round(fields["fuel_density"], 3).astype(dtype),
+        "fuel_moisture": np.round(fields["fuel_moisture"], 3).astype(dtype),
+        "wind_exposure": np.round(fields["wind_exposure"], 3).astype(dtype),
+        "grid_i": ii,
+        "grid_j": jj,
+    })
+
+
+def generate_terrain_grid(
+    rows: int = GRID_ROWS,
+    cols: int = GRID_COLS,
+    dtype=np.float64,
+    seed: int = 42,
+    store_dir: str = None,
+) -> pd.DataFrame:
     """
     Generate a grid of terrain points with elevation, slope, fuel properties.
     Models the hilly terrain of Sonoma County wine country.
+
+    Every column is built as one contiguous array over a meshgrid, so cost
+    scales linearly with rows × cols. Pass dtype=np.float32 to halve memory
+    for the physical fields (lat/lon stay float64). If store_dir is given,
+    the grid is also written there as a columnar terrain store.
     """
-    np.random.seed(42)
+    np.random.seed(seed)
 
-    rows = []
-    for i in range(GRID_ROWS):
-        for j in range(GRID_COLS):
-            lat = CENTER_LAT - (GRID_ROWS / 2 - i) * GRID_STEP_LAT
-            lon = CENTER_LON - (GRID_COLS / 2 - j) * GRID_STEP_LON
-
-            # Elevation: rolling hills with ridges (Sonoma Mountains)
-            base_elevation = 150  # meters
-            ridge_1 = 300 * np.exp(-((i - 10)**2 + (j - 30)**2) / 80)
-            ridge_2 = 250 * np.exp(-((i - 30)**2 + (j - 15)**2) / 60)
-            valley = -100 * np.exp(-((i - 20)**2 + (j - 20)**2) / 120)
-            noise = np.random.normal(0, 20)
-            elevation = max(30, base_elevation + ridge_1 + ridge_2 + valley + noise)
-
-            # Slope derived from elevation gradient (simplified)
-            slope = min(45, max(0, (ridge_1 + ridge_2) / 15 + np.random.normal(5, 3)))
-
-            # Fuel density: higher on slopes, lower in valleys/developed areas
-            developed = np.exp(-((i - 20)**2 + (j - 20)**2) / 200)
-            fuel_density = np.clip(0.3 + 0.5 * (elevation / 500) - 0.4 * developed + np.random.normal(0, 0.1), 0.05, 1.0)
-
-            # Fuel moisture: very low during red flag (Diablo winds)
-            fuel_moisture = np.clip(0.06 + 0.04 * np.random.random() + 0.1 * (1 - fuel_density), 0.03, 0.25)
-
-            # Wind exposure: higher on ridges
-            wind_exposure = np.clip(0.3 + 0.7 * (elevation / 500) + np.random.normal(0, 0.05), 0.1, 1.0)
-
-            rows.append({
-                "lat": round(lat, 6),
-                "lon": round(lon, 6),
-                "elevation": round(elevation, 1),
-                "slope": round(slope, 1),
-                "fuel_density": round(fuel_density, 3),
-                "fuel_moisture": round(fuel_moisture, 3),
-                "wind_exposure": round(wind_exposure, 3),
-                "grid_i": i,
-                "grid_j": j,
-            })
+    ii, jj = np.meshgrid(np.arange(rows), np.arange(cols), indexing="ij")
+    ii = ii.ravel()
+    jj = jj.ravel()
 
-    return pd.DataFrame(rows)
+    fields = _synthesize_terrain(ii, jj, rows, cols)
+    terrain = _terrain_frame(fields, ii, jj, dtype)
+
+    if store_dir:
+        write_terrain_store(terrain, store_dir, {
+            "rows": rows, "cols": cols, "seed": seed, "dtype": np.dtype(dtype).name,
+        })
+
+    return terrain
+
+
+TERRAIN_STORE_COLUMNS = (
+    "lat", "lon", "elevation", "slope", "fuel_density",
+    "fuel_moisture", "wind_exposure", "grid_i", "grid_j",
+)
+_TERRAIN_MANIFEST = "manifest.json"
+
+
+def write_terrain_store(terrain_df: pd.DataFrame, store_dir: str, params: dict = None):
+    """
+    Write terrain columns to store_dir as one .npy file per column.
+
+    Each file is written to a temp name and renamed into place, and the
+    manifest is written last, so concurrent readers never map a partial store.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    for col in TERRAIN_STORE_COLUMNS:
+        path = os.path.join(store_dir, f"{col}.npy")
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, np.ascontiguousarray(terrain_df[col].to_numpy()))
+        os.replace(tmp, path)
+
+    manifest = {**(params or {}), "cells": len(terrain_df), "columns": list(TERRAIN_STORE_COLUMNS)}
+    tmp = os.path.join(store_dir, f"{_TERRAIN_MANIFEST}.{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp, os.path.join(store_dir, _TERRAIN_MANIFEST))
+
+
+def read_terrain_manifest(store_dir: str) -> dict:
+    """Return the store manifest, or None if no complete store exists."""
+    try:
+        with open(os.path.join(store_dir, _TERRAIN_MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_terrain_store(store_dir: str) -> pd.DataFrame:
+    """
+    Map a terrain store read-only. Columns are views onto the page cache,
+    so every process mapping the same store shares one physical copy.
+    """
+    columns = {
+        col: np.load(os.path.join(store_dir, f"{col}.npy"), mmap_mode="r")
+        for col in TERRAIN_STORE_COLUMNS
+    }
+    return pd.DataFrame(columns, copy=False)
+
+
+def load_terrain_grid(
+    rows: int = GRID_ROWS,
+    cols: int = GRID_COLS,
+    dtype=np.float64,
+    seed: int = 42,
+    store_dir: str = TERRAIN_STORE_DIR,
+) -> pd.DataFrame:
+    """
+    Memory-map the terrain grid from store_dir, generating and writing it
+    first if the store is missing or was built with different parameters.
+
+    If the store cannot be written or mapped (read-only install, full disk),
+    the grid is generated in memory instead.
+    """
+    params = {"rows": rows, "cols": cols, "seed": seed, "dtype": np.dtype(dtype).name}
+    manifest = read_terrain_manifest(store_dir)
+    try:
+        if manifest is None or any(manifest.get(k) != v for k, v in params.items()):
+            generate_terrain_grid(rows, cols, dtype, seed, store_dir=store_dir)
+        return load_terrain_store(store_dir)
+    except OSError:
+        return generate_terrain_grid(rows, cols, dtype, seed)
+
+
+def iter_terrain_tiles(
+    rows: int = GRID_ROWS,
+    cols: int = GRID_COLS,
+    tile_size: int = 256,
+    dtype=np.float64,
+    seed: int = 42,
+):
+    """
+    Generate the terrain grid as a stream of tile_size × tile_size tiles.
+
+    Peak memory is one tile regardless of region size. Each tile is seeded
+    from (seed, tile_row, tile_col), so the stream is reproducible and any
+    single tile can be regenerated on its own. grid_i/grid_j are global.
+
+    Yields:
+        Terrain DataFrames with the same columns as generate_terrain_grid
+    """
+    for ti, r0 in enumerate(range(0, rows, tile_size)):
+        for tj, c0 in enumerate(range(0, cols, tile_size)):
+            np.random.seed([seed, ti, tj])
+            ii, jj = np.meshgrid(
+                np.arange(r0, min(r0 + tile_size, rows)),
+                np.arange(c0, min(c0 + tile_size, cols)),
+                indexing="ij",
+            )
+            ii = ii.ravel()
+            jj = jj.ravel()
+            yield _terrain_frame(_synthesize_terrain(ii, jj, rows, cols), ii, jj, dtype)
 
 
 def generate_weather_timeline(hours: int = 72) -> pd.DataFrame:
@@ -136,26 +291,241 @@ def get_critical_facilities_df() -> pd.DataFrame:
     return pd.DataFrame(CRITICAL_FACILITIES)
 
 
-def compute_powerline_proximity(terrain_df: pd.DataFrame, powerlines_df: pd.DataFrame) -> np.ndarray:
+def _line_distances(
+    cell_lat: np.ndarray,
+    cell_lon: np.ndarray,
+    powerlines_df: pd.DataFrame,
+    method: str = "midpoint",
+) -> np.ndarray:
+    """
+    Distance (in degrees) from every cell to every line, shape (cells, lines).
+
+    method="midpoint" measures to the segment midpoint (the original proxy);
+    method="segment" is the true point-to-segment distance.
+    """
+    from_lat = powerlines_df["from_lat"].to_numpy(dtype=float)
+    from_lon = powerlines_df["from_lon"].to_numpy(dtype=float)
+    to_lat = powerlines_df["to_lat"].to_numpy(dtype=float)
+    to_lon = powerlines_df["to_lon"].to_numpy(dtype=float)
+
+    py = cell_lat[:, None]
+    px = cell_lon[:, None]
+
+    if method == "midpoint":
+        dx = px - (from_lon + to_lon) / 2
+        dy = py - (from_lat + to_lat) / 2
+    elif method == "segment":
+        seg_x = to_lon - from_lon
+        seg_y = to_lat - from_lat
+        seg_len2 = seg_x**2 + seg_y**2
+        # Projection parameter clamped to the segment (degenerate segments → endpoint)
+        t = ((px - from_lon) * seg_x + (py - from_lat) * seg_y) / np.where(seg_len2 > 0, seg_len2, 1.0)
+        t = np.clip(t, 0.0, 1.0)
+        dx = px - (from_lon + t * seg_x)
+        dy = py - (from_lat + t * seg_y)
+    else:
+        raise ValueError(f"Unknown proximity method: {method!r}")
+
+    return np.sqrt(dx**2 + dy**2)
+
+
+def compute_powerline_proximity(
+    terrain_df: pd.DataFrame,
+    powerlines_df: pd.DataFrame,
+    method: str = "midpoint",
+) -> np.ndarray:
     """
     Compute proximity of each terrain point to nearest power line.
     Returns array of proximity scores (0-1, higher = closer).
+
+    All cells are scored against all active lines in one broadcast pass.
+    Use method="segment" for true point-to-segment distance.
+    """
+    if "active" in powerlines_df.columns:
+        powerlines_df = powerlines_df[powerlines_df["active"].fillna(True).astype(bool)]
+    if len(powerlines_df) == 0:
+        return np.zeros(len(terrain_df))
+
+    dist = _line_distances(
+        terrain_df["lat"].to_numpy(dtype=float),
+        terrain_df["lon"].to_numpy(dtype=float),
+        powerlines_df,
+        method,
+    )
+    proximity = np.exp(-dist / 0.02) * powerlines_df["vegetation_risk"].to_numpy(dtype=float)
+
+    return np.clip(proximity.max(axis=1), 0, 1)
+
+
+class ProximityBasis:
     """
-    proximities = np.zeros(len(terrain_df))
+    Precomputed cells × lines proximity matrix for one terrain/line geometry.
 
-    for _, pl in powerlines_df.iterrows():
-        if not pl.get("active", True):
-            continue
+    Toggling lines becomes a masked max over columns instead of a spatial
+    recompute.
+    """
 
-        # Simple point-to-segment distance proxy
-        for idx, point in terrain_df.iterrows():
-            dx = point["lon"] - (pl["from_lon"] + pl["to_lon"]) / 2
-            dy = point["lat"] - (pl["from_lat"] + pl["to_lat"]) / 2
-            dist = np.sqrt(dx**2 + dy**2)
-            proximity = np.exp(-dist / 0.02) * pl["vegetation_risk"]
-            proximities[idx] = max(proximities[idx], proximity)
+    def __init__(self, terrain_df: pd.DataFrame, powerlines_df: pd.DataFrame, method: str = "midpoint"):
+        self.method = method
+        self.line_ids = list(powerlines_df["id"])
+        self.line_index = {pl_id: j for j, pl_id in enumerate(self.line_ids)}
+        dist = _line_distances(
+            terrain_df["lat"].to_numpy(dtype=float),
+            terrain_df["lon"].to_numpy(dtype=float),
+            powerlines_df,
+            method,
+        )
+        self.matrix = np.clip(
+            np.exp(-dist / 0.02) * powerlines_df["vegetation_risk"].to_numpy(dtype=float), 0, 1,
+        )
+
+    def line_mask(self, active_line_ids) -> np.ndarray:
+        """Boolean column mask for the given active line IDs (unknown IDs ignored)."""
+        mask = np.zeros(len(self.line_ids), dtype=bool)
+        for pl_id in active_line_ids:
+            j = self.line_index.get(pl_id)
+            if j is not None:
+                mask[j] = True
+        return mask
+
+    def proximity_for(self, active_line_ids) -> np.ndarray:
+        """Proximity scores (0-1) for each cell against only the active lines."""
+        mask = self.line_mask(active_line_ids)
+        return np.max(self.matrix, axis=1, where=mask[None, :], initial=0.0)
+
+
+class LineCorridorIndex:
+    """
+    Sparse lines × cells index of the terrain cells each line corridor crosses.
 
-    return np.clip(proximities, 0, 1)
+    Every line is rasterized once: its centerline is sampled every half cell
+    and each sample takes the cells whose centers lie within half_width cells.
+    Positions are measured in grid steps (GRID_STEP_LAT/GRID_STEP_LON), so
+    cells are unit squares. Aggregating a cell field along every corridor is
+    then a CSR gather; the corridor mean is one sparse mat-vec.
+    """
+
+    def __init__(self, terrain_df: pd.DataFrame, powerlines_df: pd.DataFrame, half_width: float = 1.0):
+        from scipy.sparse import csr_matrix, diags
+        from scipy.spatial import cKDTree
+
+        self.line_ids = list(powerlines_df["id"])
+        self.line_index = {pl_id: j for j, pl_id in enumerate(self.line_ids)}
+        self.half_width = half_width
+        n_cells = len(terrain_df)
+
+        cells = np.column_stack([
+            terrain_df["lat"].to_numpy(dtype=float) / GRID_STEP_LAT,
+            terrain_df["lon"].to_numpy(dtype=float) / GRID_STEP_LON,
+        ])
+        start = np.column_stack([
+            powerlines_df["from_lat"].to_numpy(dtype=float) / GRID_STEP_LAT,
+            powerlines_df["from_lon"].to_numpy(dtype=float) / GRID_STEP_LON,
+        ])
+        end = np.column_stack([
+            powerlines_df["to_lat"].to_numpy(dtype=float) / GRID_STEP_LAT,
+            powerlines_df["to_lon"].to_numpy(dtype=float) / GRID_STEP_LON,
+        ])
+
+        # Centerline samples every half cell (endpoints included)
+        n_samples = np.ceil(2 * np.hypot(*(end - start).T)).astype(np.int64) + 1
+        owner = np.repeat(np.arange(len(self.line_ids)), n_samples)
+        offsets = np.arange(n_samples.sum()) - np.repeat(np.cumsum(n_samples) - n_samples, n_samples)
+        t = offsets / np.maximum(n_samples[owner] - 1, 1)
+        samples = start[owner] + t[:, None] * (end - start)[owner]
+
+        hits = cKDTree(cells).query_ball_point(samples, r=half_width) if n_cells else [[]] * len(samples)
+        counts = np.fromiter((len(h) for h in hits), dtype=np.int64, count=len(hits))
+        rows = np.repeat(owner, counts)
+        cols = np.fromiter((c for h in hits for c in h), dtype=np.int64, count=int(counts.sum()))
+
+        # Duplicates (a cell hit by consecutive samples) collapse to 1
+        self.matrix = csr_matrix(
+            (np.ones(len(rows)), (rows, cols)), shape=(len(self.line_ids), n_cells),
+        )
+        self.matrix.data[:] = 1.0
+        self.matrix.sort_indices()
+        self.cell_counts = np.diff(self.matrix.indptr)
+        self.mean_operator = diags(1.0 / np.maximum(self.cell_counts, 1)) @ self.matrix
+
+    def aggregate(self, cell_values: np.ndarray, percentile: float = 90) -> dict:
+        """
+        Corridor max, mean and percentile of a per-cell field.
+
+        Args:
+            cell_values: One value per terrain cell (e.g. ignition risk)
+            percentile: Percentile reported as 'p<percentile>' (linear
+                interpolation, as np.percentile)
+
+        Returns:
+            Dict of per-line arrays 'max', 'mean', 'p<percentile>' (0 for
+            lines with no cells) and 'cells' (corridor cell counts)
+        """
+        values = np.asarray(cell_values, dtype=float)
+        counts = self.cell_counts
+        starts = self.matrix.indptr[:-1]
+        gathered = values[self.matrix.indices]
+        covered = counts > 0
+
+        corridor_max = np.zeros(len(counts))
+        if covered.any():
+            corridor_max[covered] = np.maximum.reduceat(gathered, starts[covered])
+
+        # Sort within each row, then interpolate at the percentile rank
+        owner = np.repeat(np.arange(len(counts)), counts)
+        ranked = gathered[np.lexsort((gathered, owner))]
+        rank = percentile / 100 * np.maximum(counts - 1, 0)
+        lo = np.floor(rank).astype(np.int64)
+        hi = np.minimum(lo + 1, np.maximum(counts - 1, 0))
+        quantile = np.zeros(len(counts))
+        if covered.any():
+            low = ranked[starts[covered] + lo[covered]]
+            high = ranked[starts[covered] + hi[covered]]
+            quantile[covered] = low + (rank - lo)[covered] * (high - low)
+
+        return {
+            "max": corridor_max,
+            "mean": self.mean_operator @ values,
+            f"p{percentile:g}": quantile,
+            "cells": counts,
+        }
+
+
+_PROXIMITY_BASIS_CACHE: dict = {}
+_PROXIMITY_BASIS_CACHE_SIZE = 4
+
+
+def _proximity_basis_key(terrain_df: pd.DataFrame, powerlines_df: pd.DataFrame, method: str) -> str:
+    """Fingerprint of the terrain cell positions and line geometry/attributes."""
+    h = hashlib.sha1(method.encode())
+    h.update(np.ascontiguousarray(terrain_df["lat"].to_numpy(dtype=float)).tobytes())
+    h.update(np.ascontiguousarray(terrain_df["lon"].to_numpy(dtype=float)).tobytes())
+    h.update("|".join(map(str, powerlines_df["id"])).encode())
+    for col in ("from_lat", "from_lon", "to_lat", "to_lon", "vegetation_risk"):
+        h.update(np.ascontiguousarray(powerlines_df[col].to_numpy(dtype=float)).tobytes())
+    return h.hexdigest()
+
+
+def get_proximity_basis(
+    terrain_df: pd.DataFrame,
+    powerlines_df: pd.DataFrame,
+    method: str = "midpoint",
+) -> ProximityBasis:
+    """
+    Return the cached ProximityBasis for this terrain and line geometry.
+
+    The cache key covers cell positions and line endpoints/vegetation risk,
+    so any change to either builds a fresh basis. The ``active`` column is
+    ignored: the basis always spans every line.
+    """
+    key = _proximity_basis_key(terrain_df, powerlines_df, method)
+    basis = _PROXIMITY_BASIS_CACHE.pop(key, None)
+    if basis is None:
+        basis = ProximityBasis(terrain_df, powerlines_df, method)
+    _PROXIMITY_BASIS_CACHE[key] = basis
+    while len(_PROXIMITY_BASIS_CACHE) > _PROXIMITY_BASIS_CACHE_SIZE:
+        _PROXIMITY_BASIS_CACHE.pop(next(iter(_PROXIMITY_BASIS_CACHE)))
+    return basis
 
 
 def generate_wind_field(terrain_df: pd.DataFrame) -> pd.DataFrame:
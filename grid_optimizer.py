@@ -4,13 +4,108 @@ GPU-ready graph optimization for targeted de-energization with critical load pre
 Designed for cuGraph compatibility; uses NetworkX for prototype.
 """
 
+import bisect
+import copy
+import hashlib
+import heapq
+import itertools
+import json
+import math
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 import networkx as nx
 import numpy as np
 import pandas as pd
-from itertools import combinations
 from config import SUBSTATIONS, POWER_LINES, CRITICAL_FACILITIES
 
 
+class RollbackUnionFind:
+    """
+    Union-find with undo, for walking edge sets depth-first.
+
+    Union by size without path compression keeps every merge reversible:
+    snapshot() marks the history and rollback() undoes merges back to it.
+    find() is O(log n); union and rollback are O(log n) and O(1) per merge.
+    """
+
+    def __init__(self, nodes):
+        self.index = {node: i for i, node in enumerate(nodes)}
+        self.parent = list(range(len(self.index)))
+        self.size = [1] * len(self.index)
+        self.components = len(self.index)
+        self.history = []
+
+    def find(self, node) -> int:
+        x = self.index[node]
+        while self.parent[x] != x:
+            x = self.parent[x]
+        return x
+
+    def union(self, a, b) -> bool:
+        """Merge the sets of a and b; returns False if already joined."""
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return False
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+        self.components -= 1
+        self.history.append((ra, rb))
+        return True
+
+    def snapshot(self) -> int:
+        return len(self.history)
+
+    def rollback(self, mark: int):
+        """Undo every merge made since snapshot() returned mark."""
+        while len(self.history) > mark:
+            ra, rb = self.history.pop()
+            self.parent[rb] = rb
+            self.size[ra] -= self.size[rb]
+            self.components += 1
+
+
+def combination_matrix(n: int, m: int) -> np.ndarray:
+    """
+    All m-combinations of range(n) as an (C(n, m), m) int array, in the
+    same lexicographic order as itertools.combinations, built with NumPy.
+    """
+    if m > n:
+        return np.zeros((0, m), dtype=np.int64)
+    combos = np.arange(n - m + 1, dtype=np.int64)[:, None]
+    for col in range(1, m):
+        last = combos[:, -1]
+        # Each row extends with every value after its last one that still
+        # leaves room for the remaining columns
+        counts = n - m + col - last
+        starts = np.repeat(last + 1, counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        combos = np.hstack([np.repeat(combos, counts, axis=0), (starts + offsets)[:, None]])
+    return combos
+
+
+PLAN_CACHE_SIZE = 16
+LINE_SCORE_CACHE_SIZE = 256     # a 72-hour timeline fits several times over
+
+# Overload screening inside the plan search: plans per DC power-flow batch,
+# and the most plans one search screens before returning what it has
+SCREEN_BATCH = 256
+MAX_SCREENED_PLANS = 50_000
+
+# Terrain corridor blend: share of each line score taken from the risk along
+# its corridor, and how the corridor max/p90/mean combine into that share
+CORRIDOR_BLEND = 0.5
+CORRIDOR_WEIGHTS = {"max": 0.4, "p90": 0.4, "mean": 0.2}
+
+
+def weather_fingerprint(weather: dict) -> str:
+    """Stable hash of a weather dict, used as a memoization key."""
+    payload = json.dumps(weather, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
 class GridOptimizer:
     """
     Power grid graph optimizer for intelligent de-energization.
@@ -19,28 +114,71 @@ class GridOptimizer:
     Uses graph-based optimization (NetworkX; production: NVIDIA cuGraph).
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        substations: list[dict] = None,
+        power_lines: list[dict] = None,
+        critical_facilities: list[dict] = None,
+        terrain_df: pd.DataFrame = None,
+    ):
+        """
+        Args:
+            substations, power_lines, critical_facilities: Grid definition in
+                the config.py schema (defaults: the config grid)
+            terrain_df: Terrain grid; if given, each line is rasterized into
+                the cells its corridor crosses and line scores blend in the
+                terrain risk along it (see compute_line_risk_scores)
+        """
+        substations = SUBSTATIONS if substations is None else substations
         self.graph = nx.Graph()
-        self.substations = {s["id"]: s for s in SUBSTATIONS}
-        self.power_lines = {pl["id"]: pl for pl in POWER_LINES}
-        self.critical_facilities = CRITICAL_FACILITIES
+        self.substations = {s["id"]: s for s in substations}
+        self.power_lines = {pl["id"]: pl for pl in (POWER_LINES if power_lines is None else power_lines)}
+        self.critical_facilities = CRITICAL_FACILITIES if critical_facilities is None else critical_facilities
+        self.edge_index = {}  # line id → (u, v) graph edge
+        # Substations with bulk supply; a grid without any is fed from its largest
+        self.sources = {s["id"] for s in substations if s.get("source")} or {
+            max(substations, key=lambda s: s["capacity_mw"])["id"]
+        }
+        self._power_flow = None  # see get_power_flow
+        self._contingency = None  # see analyze_contingencies
+        self.terrain_df = terrain_df
+        self.corridor_index = None if terrain_df is None else self._build_corridor_index(terrain_df)
         self._build_graph()
+        self._init_caches()
+
+    def _init_caches(self):
+        """LRUs of line scores by weather fingerprint and of ranked plans."""
+        self._line_score_cache = OrderedDict()
+        self._plan_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def __getstate__(self):
+        # Caches and the lock stay in the parent process (see _init_search_worker)
+        state = self.__dict__.copy()
+        for key in ("_line_score_cache", "_plan_cache", "_cache_lock"):
+            state.pop(key, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_caches()
 
     def _build_graph(self):
-        """Build the grid graph from config data."""
+        """Build the grid graph from the substation and line definitions."""
         # Add substation nodes
-        for sub in SUBSTATIONS:
+        for sub in self.substations.values():
             self.graph.add_node(
                 sub["id"],
                 name=sub["name"],
                 lat=sub["lat"],
                 lon=sub["lon"],
                 capacity_mw=sub["capacity_mw"],
+                source=sub["id"] in self.sources,
                 node_type="substation",
             )
 
         # Add power line edges
-        for pl in POWER_LINES:
+        for pl in self.power_lines.values():
             self.graph.add_edge(
                 pl["from"],
                 pl["to"],
@@ -51,6 +189,48 @@ class GridOptimizer:
                 age_years=pl["age_years"],
                 active=True,
             )
+            self.edge_index[pl["id"]] = (pl["from"], pl["to"])
+
+    def _build_corridor_index(self, terrain_df: pd.DataFrame):
+        """Rasterize every line (straight between its substations) onto the terrain."""
+        from data_generator import LineCorridorIndex
+
+        geometry = pd.DataFrame([
+            {
+                "id": pl_id,
+                "from_lat": self.substations[pl["from"]]["lat"],
+                "from_lon": self.substations[pl["from"]]["lon"],
+                "to_lat": self.substations[pl["to"]]["lat"],
+                "to_lon": self.substations[pl["to"]]["lon"],
+            }
+            for pl_id, pl in self.power_lines.items()
+        ], columns=["id", "from_lat", "from_lon", "to_lat", "to_lon"])
+        return LineCorridorIndex(terrain_df, geometry)
+
+    def compute_corridor_risk(self, weather: dict) -> dict:
+        """
+        Terrain ignition risk along each line corridor.
+
+        Returns:
+            Dict mapping line_id → {'max', 'mean', 'p90', 'cells'}; empty
+            without terrain, and lines whose corridor misses the terrain
+            are left out
+        """
+        if self.corridor_index is None:
+            return {}
+        from risk_engine import compute_corridor_risk
+
+        agg = compute_corridor_risk(self.terrain_df, self.corridor_index, weather)
+        return {
+            pl_id: {
+                "max": round(float(agg["max"][j]), 4),
+                "mean": round(float(agg["mean"][j]), 4),
+                "p90": round(float(agg["p90"][j]), 4),
+                "cells": int(agg["cells"][j]),
+            }
+            for j, pl_id in enumerate(self.corridor_index.line_ids)
+            if agg["cells"][j]
+        }
 
     def compute_line_risk_scores(self, weather: dict) -> dict:
         """
@@ -61,10 +241,22 @@ class GridOptimizer:
             - Equipment age
             - Wind speed × vegetation risk interaction
             - Voltage (higher voltage = more arc risk)
+            - Terrain risk along the corridor (max, p90, mean), when the
+              optimizer has terrain: blended in with weight CORRIDOR_BLEND
+
+        Scores are memoized per weather fingerprint in an LRU cache
+        (LINE_SCORE_CACHE_SIZE entries).
 
         Returns:
             Dict mapping line_id → risk_score (0-1)
         """
+        key = weather_fingerprint(weather)
+        with self._cache_lock:
+            cached = self._line_score_cache.get(key)
+            if cached is not None:
+                self._line_score_cache.move_to_end(key)
+                return dict(cached)
+
         scores = {}
         for pl_id, pl in self.power_lines.items():
             veg_risk = pl["vegetation_risk"]
@@ -82,24 +274,50 @@ class GridOptimizer:
                 0.10 * wind_factor +
                 0.10 * voltage_factor
             )
-            scores[pl_id] = round(min(1.0, score), 4)
+            scores[pl_id] = min(1.0, score)
+
+        for pl_id, corridor in self.compute_corridor_risk(weather).items():
+            terrain = sum(w * corridor[stat] for stat, w in CORRIDOR_WEIGHTS.items())
+            scores[pl_id] = (1 - CORRIDOR_BLEND) * scores[pl_id] + CORRIDOR_BLEND * terrain
+        scores = {pl_id: round(min(1.0, score), 4) for pl_id, score in scores.items()}
 
-        return scores
+        with self._cache_lock:
+            self._line_score_cache[key] = scores
+            while len(self._line_score_cache) > LINE_SCORE_CACHE_SIZE:
+                self._line_score_cache.popitem(last=False)
+        return dict(scores)
 
     def get_critical_load_feeders(self) -> set:
-        """Get set of power line IDs that serve critical facilities."""
-        return {cf["feeder"] for cf in self.critical_facilities}
+        """
+        Get set of power line IDs whose loss alone cuts a critical facility
+        off from every source. Only bridges of the grid graph can do that;
+        all of them are scored in one DFS (see contingency.py).
+        """
+        losses = self._get_contingency_analyzer().single_trip_losses()
+        return {pl_id for pl_id, lost in losses.items() if lost}
 
-    def get_affected_facilities(self, disabled_lines: set) -> list[dict]:
+    def get_affected_facilities(self, disabled_lines: set, deenergized: set = None) -> list[dict]:
         """
         Determine which critical facilities lose power from disabled lines.
 
+        A facility loses power when its substation is no longer connected to
+        any source substation through energized lines.
+
+        Args:
+            disabled_lines: Line IDs that are switched off
+            deenergized: Precomputed de-energized substations, if known
+                (check_grid_connectivity's 'deenergized_substations')
+
         Returns:
             List of affected facility dicts with impact details
         """
+        if deenergized is None:
+            deenergized = self.check_grid_connectivity(disabled_lines)["deenergized_substations"]
+        deenergized = set(deenergized)
+
         affected = []
         for cf in self.critical_facilities:
-            if cf["feeder"] in disabled_lines:
+            if cf["substation"] in deenergized:
                 affected.append({
                     **cf,
                     "impact": "POWER LOSS",
@@ -114,29 +332,813 @@ class GridOptimizer:
         Returns:
             Dict with connectivity analysis
         """
-        test_graph = self.graph.copy()
-        for pl_id in disabled_lines:
-            # Find and remove the edge with this ID
-            for u, v, data in list(test_graph.edges(data=True)):
-                if data.get("id") == pl_id:
-                    test_graph.remove_edge(u, v)
-                    break
+        # Filtered view hides the disabled edges without copying the graph
+        hidden = [self.edge_index[pl_id] for pl_id in disabled_lines if pl_id in self.edge_index]
+        test_graph = nx.restricted_view(self.graph, [], hidden)
 
+        # One traversal per component; a component is live if it holds a source
         components = list(nx.connected_components(test_graph))
         isolated = [sub_id for comp in components if len(comp) == 1 for sub_id in comp]
+        deenergized = [sub_id for comp in components if not comp & self.sources for sub_id in comp]
 
         return {
             "connected": len(components) == 1,
             "num_components": len(components),
             "components": [list(c) for c in components],
             "isolated_substations": isolated,
+            "deenergized_substations": deenergized,
+        }
+
+    def _evaluate_plan(self, combo: list, line_risks: dict, connectivity: dict = None) -> dict:
+        """
+        Score one shutoff combination (plan dict without rank/confidence).
+
+        Args:
+            combo: Line IDs to disable
+            line_risks: Output of compute_line_risk_scores
+            connectivity: Precomputed check_grid_connectivity result, if any
+                (needs 'connected', 'num_components' and
+                'deenergized_substations')
+        """
+        combo_set = set(combo)
+
+        # Compute total risk removed (exact sum, independent of line order)
+        total_risk_removed = math.fsum(line_risks.get(pl_id, 0) for pl_id in combo)
+
+        # Check connectivity impact
+        if connectivity is None:
+            connectivity = self.check_grid_connectivity(combo_set)
+
+        # Check affected facilities
+        affected = self.get_affected_facilities(combo_set, connectivity["deenergized_substations"])
+        critical_affected = [f for f in affected if f["severity"] == "CRITICAL"]
+
+        # Compute disruption score
+        disruption = (
+            len(combo_set) * 0.2 +                                    # lines disabled
+            (0 if connectivity["connected"] else 0.3) +               # fragmentation
+            len(critical_affected) * 0.4 +                            # critical impact
+            len(affected) * 0.1                                       # any facility impact
+        )
+
+        # Risk-reduction-per-disruption ratio (higher = better)
+        efficiency = total_risk_removed / max(disruption, 0.01)
+
+        return {
+            "lines_disabled": list(combo),
+            "line_names": [self.power_lines[pl_id]["name"] for pl_id in combo],
+            "total_risk_removed": round(total_risk_removed, 4),
+            "disruption_score": round(disruption, 4),
+            "efficiency_ratio": round(efficiency, 4),
+            "grid_connected": connectivity["connected"],
+            "num_components": connectivity["num_components"],
+            "affected_facilities": affected,
+            "critical_facilities_impacted": len(critical_affected),
+            "customers_affected": sum(self.power_lines[pl_id].get("customers", 0) for pl_id in combo),
         }
 
+    def _search_top_plans(
+        self,
+        candidates: list,
+        line_risks: dict,
+        max_shutoffs: int,
+        top_k: int,
+        roots: set = None,
+        protect_critical: bool = False,
+        threshold: tuple = None,
+        screen_overloads: bool = False,
+    ) -> list[tuple]:
+        """
+        Branch-and-bound top-K search over combinations of candidate lines.
+
+        Candidates are taken in descending risk order. For a partial plan S,
+        every extension of size m removes at most the risk of S plus the next
+        m - |S| highest-risk candidates, and its disruption is at least
+        0.2·m plus the facility/fragmentation disruption of S (both only grow
+        as lines are removed). That ratio is an admissible upper bound on
+        efficiency_ratio. Because candidates are risk-sorted, the bound also
+        covers every later sibling, so one frontier entry stands for "S plus
+        q or any later line". Entries are expanded best-bound first, and the
+        search ends once the best remaining bound cannot beat the current
+        K-th plan.
+
+        Ties are broken exactly like a stable sort of brute-force enumeration
+        (by plan size, then candidate order), so results match brute force.
+
+        Connectivity is tracked incrementally. One DFS of the intact grid
+        gives every line a cycle-space label (0 for bridges); removing S adds
+        |S| - rank(labels of S) components. Each partial plan carries a GF(2)
+        basis of its labels, and adding a line reduces its label against at
+        most k pivots, so component counts cost O(k) per plan. De-energized
+        substations only change when a plan cuts off a piece. If the cut is
+        made of bridges alone, the pieces are nested DFS subtrees, read off
+        as tin-order slices. Only cuts through cycles (a label reducing to
+        zero) fall back to a rollback union-find over the remaining lines.
+
+        With protect_critical, plans that cut any facility off are dropped
+        together with their extensions (removing more lines never restores
+        power).
+
+        threshold is a sort key known to be at most the final K-th best (for
+        instance the K-th best of a search over other roots). It prunes like
+        a full heap from the start, and plans below it are not kept.
+
+        With screen_overloads, only plans that pass the DC overload screen
+        enter the heap, so the bound tightens on feasible plans alone. Plans
+        that would enter are screened in batches of SCREEN_BATCH
+        (DCPowerFlow.screen) as the search produces them, best first; since
+        plans come out in roughly descending efficiency, the screened plans
+        are close to those that outrank the K-th feasible one. An overloaded
+        plan is not pruned, since taking out more lines can relieve the
+        overload. After MAX_SCREENED_PLANS screened plans the search stops
+        and returns the feasible plans found.
+        """
+        n = len(candidates)
+        k = min(max_shutoffs, n)
+        order = sorted(range(n), key=lambda i: -line_risks.get(candidates[i], 0))
+        ids = [candidates[i] for i in order]
+        prefix = [0.0]
+        for pl_id in ids:
+            prefix.append(prefix[-1] + line_risks.get(pl_id, 0))
+
+        heap = []  # min-heap of (sort key, plan); heap[0] is the current K-th best
+        pending = []  # plans waiting for the overload screen
+        screened = [0]
+
+        def admit(key, plan):
+            if len(heap) < top_k:
+                heapq.heappush(heap, (key, plan))
+            elif key > heap[0][0]:
+                heapq.heapreplace(heap, (key, plan))
+
+        def flush():
+            # Best first, so the heap fills early and the rest can be skipped
+            pending.sort(key=lambda item: item[0], reverse=True)
+            for start in range(0, len(pending), SCREEN_BATCH):
+                batch = [item for item in pending[start:start + SCREEN_BATCH]
+                         if len(heap) < top_k or item[0] > heap[0][0]]
+                if not batch or screened[0] >= MAX_SCREENED_PLANS:
+                    break
+                results = self.get_power_flow().screen([plan["lines_disabled"] for _, plan in batch])
+                screened[0] += len(batch)
+                for (key, plan), result in zip(batch, results):
+                    if result["feasible"]:
+                        plan["max_line_loading"] = result["max_loading"]
+                        plan["overloaded_lines"] = result["overloaded_lines"]
+                        admit(key, plan)
+            pending.clear()
+
+        analyzer = self._get_contingency_analyzer()
+        d = analyzer.intact()
+        index = {pl_id: e for e, pl_id in enumerate(analyzer.line_ids)}
+        labels = [int(d["label"][index[pl_id]]) for pl_id in ids]
+        children = [int(d["tree_child"][index[pl_id]]) if d["bridge"][index[pl_id]] else -1 for pl_id in ids]
+        base_components = d["n_comp"]
+        pieces = _BridgePieces(d, analyzer.nodes)
+
+        # Lines that can never be disabled are merged once, for cuts through cycles
+        uf = RollbackUnionFind(self.graph.nodes)
+        candidate_set = set(candidates)
+        for pl_id, (u, v) in self.edge_index.items():
+            if pl_id not in candidate_set:
+                uf.union(u, v)
+        base = uf.snapshot()
+        edges = [self.edge_index[pl_id] for pl_id in ids]
+        nodes = list(self.graph.nodes)
+
+        def cycle_cut_deenergized(plan_positions):
+            off = set(plan_positions)
+            for p in range(n):
+                if p not in off:
+                    uf.union(*edges[p])
+            live = {uf.find(s) for s in self.sources}
+            dark = [node for node in nodes if uf.find(node) not in live]
+            uf.rollback(base)
+            return dark
+
+        def bound(risk, size, q, floor):
+            """Best possible efficiency of S ∪ {q, ...} for all sizes up to k."""
+            best = float("-inf")
+            for m in range(size + 1, min(k, size + n - q) + 1):
+                risk_ub = risk + prefix[q + m - size] - prefix[q]
+                best = max(best, risk_ub / max(0.2 * m + floor, 0.01))
+            return best
+
+        # A node is a partial plan: (positions, risk, disruption floor, label
+        # rank, cuts through cycles, DFS child of each bridge, GF(2) basis as
+        # pivot bit → reduced label). A frontier entry (node, q) stands for
+        # the node extended by q or any later position, under one bound.
+        frontier = []
+        tie = itertools.count()
+        root_list = sorted(roots) if roots is not None else None
+
+        def extend(node, q):
+            if len(node[0]) == k:
+                return
+            if not node[0] and root_list is not None:
+                i = bisect.bisect_left(root_list, q)
+                q = root_list[i] if i < len(root_list) else n
+            if q < n:
+                heapq.heappush(frontier, (-bound(node[1], len(node[0]), q, node[2]), next(tie), node, q))
+
+        extend(((), 0.0, 0.0, 0, 0, (), {}), 0)
+        while screened[0] < MAX_SCREENED_PLANS:
+            cutoff = heap[0][0] if len(heap) >= top_k else threshold
+            if not frontier or (cutoff is not None and round(-frontier[0][0], 4) < cutoff[0]):
+                if not pending:
+                    break
+                flush()  # may raise the cutoff; nothing left to expand otherwise
+                continue
+
+            _, _, node, q = heapq.heappop(frontier)
+            extend(node, q + 1)
+            positions, risk, _, rank, cuts, bridges, basis = node
+
+            # Reduce q's label against the basis of the partial plan
+            x = labels[q]
+            while x and x.bit_length() - 1 in basis:
+                x ^= basis[x.bit_length() - 1]
+            child = positions + (q,)
+            child_rank = rank + (x != 0)
+            child_cuts = cuts + (x == 0 and children[q] < 0)
+            child_bridges = bridges + (children[q],) if children[q] >= 0 else bridges
+
+            components = base_components + len(child) - child_rank
+            if child_cuts:
+                deenergized = cycle_cut_deenergized(child)
+            else:
+                deenergized = pieces.deenergized(list(child_bridges))
+            connectivity = {
+                "connected": components == 1,
+                "num_components": components,
+                "deenergized_substations": deenergized,
+            }
+            originals = sorted(order[p] for p in child)
+            plan = self._evaluate_plan([candidates[i] for i in originals], line_risks, connectivity)
+
+            if protect_critical and plan["affected_facilities"]:
+                continue
+            key = (plan["efficiency_ratio"], -len(child), tuple(-i for i in originals))
+            if threshold is None or key > threshold:
+                if not screen_overloads:
+                    admit(key, plan)
+                elif len(heap) < top_k or key > heap[0][0]:
+                    pending.append((key, plan))
+                    if len(pending) >= SCREEN_BATCH:
+                        flush()
+
+            if len(child) < k:
+                child_basis = {**basis, x.bit_length() - 1: x} if x else basis
+                child_risk = risk + line_risks.get(ids[q], 0)
+                extend((
+                    child, child_risk, plan["disruption_score"] - 0.2 * len(child),
+                    child_rank, child_cuts, child_bridges, child_basis,
+                ), q + 1)
+
+        return sorted(heap, key=lambda item: item[0], reverse=True)
+
+    def _search_top_plans_parallel(
+        self,
+        candidates: list,
+        line_risks: dict,
+        max_shutoffs: int,
+        top_k: int,
+        workers: int,
+        protect_critical: bool = False,
+        screen_overloads: bool = False,
+    ) -> list[tuple]:
+        """
+        Shard the branch-and-bound search across a process pool.
+
+        The combination tree is split by its first line, in risk order. The
+        parent first searches the highest-risk roots itself; the top plans
+        almost always start there, so its K-th best key is a tight threshold
+        that every shard starts from instead of an empty heap. The remaining
+        roots are dealt round-robin into several shards per worker so the
+        large early subtrees spread across cores.
+
+        The grid is sent to each worker once, through the pool initializer,
+        without the terrain, corridor index and power-flow and contingency
+        models (the search rebuilds the ones it needs). Shards only carry
+        their root positions and the threshold.
+        """
+        n = len(candidates)
+        n_shards = min(n, workers * 4)
+        head = set(range(-(-n // (n_shards + 1))))
+        ranked = self._search_top_plans(
+            candidates, line_risks, max_shutoffs, top_k, head, protect_critical, None, screen_overloads,
+        )
+        threshold = ranked[-1][0] if len(ranked) >= top_k else None
+        # Same root bound as the search: if the next root cannot reach the
+        # threshold, no later one can and the pool is not needed
+        risks = sorted((line_risks.get(pl_id, 0) for pl_id in candidates), reverse=True)
+        q = len(head)
+        reach = max(
+            (sum(risks[q:q + m]) / max(0.2 * m, 0.01) for m in range(1, min(max_shutoffs, n - q) + 1)),
+            default=float("-inf"),
+        )
+        if threshold is not None and round(reach, 4) < threshold[0]:
+            return ranked
+        rest = range(q, n)
+        shards = [set(rest[s::n_shards]) for s in range(n_shards) if rest[s::n_shards]]
+
+        worker = copy.copy(self)
+        worker.terrain_df = None
+        worker.corridor_index = None
+        worker._power_flow = None
+        worker._contingency = None  # holds a reference back to self
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_search_worker, initargs=(worker,)) as pool:
+            futures = [
+                pool.submit(
+                    _search_shard, candidates, line_risks, max_shutoffs, top_k, roots,
+                    protect_critical, threshold, screen_overloads,
+                )
+                for roots in shards
+            ]
+            results = ranked + [item for future in futures for item in future.result()]
+
+        return sorted(results, key=lambda item: item[0], reverse=True)[:top_k]
+
+    @staticmethod
+    def _bridge_piece_losses(d: dict, pos: np.ndarray, is_bridge: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Facilities cut off from every source by removing bridges, per row.
+
+        Removing bridges b1..bm splits the DFS forest into nested pieces:
+        each bridge's child subtree minus the subtrees of the nearest removed
+        bridges below it, plus the remainder of each component. A piece is
+        dark when its source count is zero. Components that are dark in the
+        intact grid are left out (the caller counts them).
+
+        Args:
+            d: ContingencyAnalyzer._dfs result for the intact grid
+            pos: (rows, k) line positions (-1 padding)
+            is_bridge: (rows, k) mask of positions holding a bridge
+
+        Returns:
+            (affected, critical) facility counts per row
+        """
+        child = np.where(is_bridge, d["tree_child"][pos.clip(0)], 0)
+        tin, tout = d["tin"][child], d["tout"][child]
+
+        # below[r, i, j]: bridge j lies in bridge i's subtree
+        below = (
+            is_bridge[:, :, None] & is_bridge[:, None, :]
+            & (tin[:, :, None] < tin[:, None, :]) & (tout[:, None, :] <= tout[:, :, None])
+        )
+        between = np.einsum("rik,rkj->rij", below.astype(np.int64), below.astype(np.int64)) > 0
+        nearest = (below & ~between).astype(np.int64)
+        top = is_bridge & ~below.any(axis=1)
+
+        comp = d["comp"][child]
+        lit = is_bridge & (d["comp_src"][comp] > 0)
+        affected = np.zeros(len(pos), dtype=np.int64)
+        critical = np.zeros(len(pos), dtype=np.int64)
+        counts = {key: np.where(is_bridge, d[key][child], 0) for key in ("src", "fac", "crit")}
+        piece = {key: value - np.einsum("rij,rj->ri", nearest, value) for key, value in counts.items()}
+        dark = lit & (piece["src"] == 0)
+        affected += np.where(dark, piece["fac"], 0).sum(axis=1)
+        critical += np.where(dark, piece["crit"], 0).sum(axis=1)
+
+        # Component remainders: totals minus the top-level subtrees, counted
+        # once per component (at its first top-level bridge)
+        same = top[:, :, None] & top[:, None, :] & (comp[:, :, None] == comp[:, None, :])
+        first = top & ~np.tril(same, k=-1).any(axis=2)
+        for key, total in (("src", "comp_src"), ("fac", "comp_fac"), ("crit", "comp_crit")):
+            piece[key] = d[total][comp] - np.einsum("rij,rj->ri", same.astype(np.int64), counts[key])
+        dark = first & lit & (piece["src"] == 0)
+        affected += np.where(dark, piece["fac"], 0).sum(axis=1)
+        critical += np.where(dark, piece["crit"], 0).sum(axis=1)
+        return affected, critical
+
+    def _split_row_losses(self, candidates: list, combos: np.ndarray, block: int = 2_000_000) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Facilities without a source path for each combination, by batched
+        connected components.
+
+        Lines that are never removed are contracted first, so each row is a
+        small graph over the candidate lines. Rows are stacked as disjoint
+        copies of that graph (about `block` nodes + edges per batch) and
+        labelled with one scipy connected_components call per batch.
+
+        Returns:
+            (affected, critical) facility counts per row
+        """
+        from scipy.sparse import coo_matrix
+        from scipy.sparse.csgraph import connected_components
+
+        nodes = {node: i for i, node in enumerate(self.graph.nodes)}
+        candidate_set = set(candidates)
+        fixed = np.array(
+            [[nodes[u], nodes[v]] for pl_id, (u, v) in self.edge_index.items() if pl_id not in candidate_set],
+            dtype=np.int64,
+        ).reshape(-1, 2)
+        n_v = len(nodes)
+        _, supernode = connected_components(
+            coo_matrix((np.ones(len(fixed)), (fixed[:, 0], fixed[:, 1])), shape=(n_v, n_v)), directed=False,
+        )
+        n_s = supernode.max() + 1 if n_v else 0
+
+        src = np.bincount(supernode[[nodes[s] for s in self.sources]], minlength=n_s)
+        fac_nodes = np.array([nodes[cf["substation"]] for cf in self.critical_facilities], dtype=np.int64)
+        fac = np.bincount(supernode[fac_nodes], minlength=n_s)
+        crit = np.bincount(
+            supernode[fac_nodes],
+            weights=[cf["priority"] == 1 for cf in self.critical_facilities],
+            minlength=n_s,
+        ).astype(np.int64)
+        ends = supernode[np.array([[nodes[u], nodes[v]] for u, v in (self.edge_index[pl_id] for pl_id in candidates)])]
+
+        n = len(candidates)
+        live = np.ones((len(combos), n + 1), dtype=bool)
+        np.put_along_axis(live, np.where(combos >= 0, combos, n), False, axis=1)
+        live = live[:, :n]
+
+        affected = np.zeros(len(combos), dtype=np.int64)
+        critical = np.zeros(len(combos), dtype=np.int64)
+        step = max(1, block // (n_s + n))
+        for start in range(0, len(combos), step):
+            rows = live[start:start + step]
+            r, e = np.nonzero(rows)
+            offset = r * n_s
+            size = len(rows) * n_s
+            _, label = connected_components(
+                coo_matrix((np.ones(len(e)), (offset + ends[e, 0], offset + ends[e, 1])), shape=(size, size)),
+                directed=False,
+            )
+            lit = np.bincount(label, weights=np.tile(src, len(rows)), minlength=label.max() + 1) > 0
+            dark = ~lit[label].reshape(len(rows), n_s)
+            affected[start:start + step] = dark @ fac
+            critical[start:start + step] = dark @ crit
+        return affected, critical
+
+    def _score_all_combinations(self, candidates: list, line_risks: dict, max_shutoffs: int) -> dict:
+        """
+        Score every combination of up to max_shutoffs candidates as arrays.
+
+        Each combination is a row of candidate indices (padded with -1, which
+        gathers a zero sentinel). Risk removed and customers are gather-sums.
+
+        Connectivity comes from one DFS of the intact grid
+        (ContingencyAnalyzer._dfs): removing S adds |S| - rank_GF2(labels of
+        S) components, with the rank taken row-wise over the lines' cycle-space
+        labels. Facilities can only lose power in rows that split the grid.
+        Where the split comes from bridges alone (the non-bridge labels are
+        independent), the pieces are nested DFS subtrees and their facility
+        losses are array arithmetic on subtree counts (_bridge_piece_losses).
+        The few rank-deficient rows, cuts through cycles, are labelled by
+        batched connected components (_split_row_losses). Every other row
+        keeps the intact grid's facility impact.
+
+        Returns:
+            Dict of arrays in brute-force enumeration order (size, then
+            lexicographic): 'combos' (rows padded with -1), 'sizes', 'risk',
+            'customers', 'affected', 'critical_affected', 'num_components',
+            'disruption' and 'efficiency'
+        """
+        n = len(candidates)
+        k = min(max_shutoffs, n)
+        blocks = [combination_matrix(n, m) for m in range(1, k + 1)]
+        combos = np.full((sum(len(b) for b in blocks), k), -1, dtype=np.int64)
+        row = 0
+        for m, block in enumerate(blocks, start=1):
+            combos[row:row + len(block), :m] = block
+            row += len(block)
+        valid = combos >= 0
+        sizes = valid.sum(axis=1)
+
+        # Risk removed: gather-sum over the padded index matrix
+        risks = np.append([line_risks.get(pl_id, 0) for pl_id in candidates], 0.0)
+        risk = risks[combos].sum(axis=1)
+        line_customers = np.append([self.power_lines[pl_id].get("customers", 0) for pl_id in candidates], 0)
+        customers = line_customers[combos].sum(axis=1)
+
+        # One DFS of the intact grid: bridges, labels and subtree counts
+        analyzer = self._get_contingency_analyzer()
+        d = analyzer.intact()
+        index = {pl_id: e for e, pl_id in enumerate(analyzer.line_ids)}
+        line_pos = np.append([index[pl_id] for pl_id in candidates], -1)
+        pos = line_pos[combos]
+
+        # Connectivity: components = base + |S| - rank_GF2(labels of S)
+        labels = np.append(d["label"], np.uint64(0))
+        vec = labels[pos]
+        rank = np.zeros(len(combos), dtype=np.int64)
+        for i in range(k):
+            pivot = vec[:, i]
+            nonzero = pivot != 0
+            rank += nonzero
+            low_bit = pivot & (~pivot + np.uint64(1))
+            for j in range(i + 1, k):
+                hit = nonzero & ((vec[:, j] & low_bit) != 0)
+                vec[:, j] = np.where(hit, vec[:, j] ^ pivot, vec[:, j])
+        base_components = d["n_comp"]
+        num_components = base_components + sizes - rank
+
+        # Facility impact. Components without a source are dark in every row.
+        comp_dark = d["comp_src"] == 0
+        intact_affected = int(d["comp_fac"][comp_dark].sum())
+        intact_critical = int(d["comp_crit"][comp_dark].sum())
+        affected = np.full(len(combos), intact_affected, dtype=np.int64)
+        critical = np.full(len(combos), intact_critical, dtype=np.int64)
+
+        # Rows whose non-bridge lines are independent only split at their
+        # bridges; each removed bridge cuts off its child's subtree, so the
+        # pieces are nested subtrees scored from the DFS counts as arrays
+        is_bridge = np.append(d["bridge"], False)[pos]
+        non_bridges = (valid & ~is_bridge).sum(axis=1)
+        split = is_bridge.any(axis=1) & (rank == non_bridges)
+        rows = np.flatnonzero(split)
+        if len(rows):
+            piece_affected, piece_critical = self._bridge_piece_losses(d, pos[rows], is_bridge[rows])
+            affected[rows] += piece_affected
+            critical[rows] += piece_critical
+
+        # Rank-deficient rows cut the grid through cycles: batched components
+        deficient = np.flatnonzero(rank < non_bridges)
+        if len(deficient):
+            affected[deficient], critical[deficient] = self._split_row_losses(candidates, combos[deficient])
+
+        disruption = (
+            sizes * 0.2 +
+            np.where(num_components == 1, 0.0, 0.3) +
+            critical * 0.4 +
+            affected * 0.1
+        )
+        efficiency = risk / np.maximum(disruption, 0.01)
+
+        return {
+            "combos": combos,
+            "sizes": sizes,
+            "risk": risk,
+            "customers": customers,
+            "affected": affected,
+            "critical_affected": critical,
+            "num_components": num_components,
+            "disruption": disruption,
+            "efficiency": efficiency,
+        }
+
+    def _vectorized_top_plans(
+        self,
+        candidates: list,
+        line_risks: dict,
+        max_shutoffs: int,
+        top_k: int,
+        protect_critical: bool = False,
+        screen_overloads: bool = False,
+    ) -> list[tuple]:
+        """
+        Top-K plans from _score_all_combinations; dicts only for the winners.
+
+        With screen_overloads, the ranking is screened best-first in batches
+        of SCREEN_BATCH until top_k plans pass (at most MAX_SCREENED_PLANS).
+        """
+        if not candidates:
+            return []
+        scored = self._score_all_combinations(candidates, line_risks, max_shutoffs)
+        eff = np.round(scored["efficiency"], 4)
+        if protect_critical:
+            eff = np.where(scored["affected"] == 0, eff, -np.inf)
+        # Stable best-first order: efficiency desc, then enumeration order
+        order = np.lexsort((np.arange(len(eff)), -eff))
+        order = order[np.isfinite(eff[order])]
+
+        def combos(rows):
+            return [[candidates[i] for i in scored["combos"][r] if i >= 0] for r in rows]
+
+        if not screen_overloads:
+            return [(None, self._evaluate_plan(combo, line_risks)) for combo in combos(order[:top_k])]
+
+        ranked = []
+        for start in range(0, min(len(order), MAX_SCREENED_PLANS), SCREEN_BATCH):
+            batch = combos(order[start:start + SCREEN_BATCH])
+            for combo, result in zip(batch, self.get_power_flow().screen(batch)):
+                if not result["feasible"]:
+                    continue
+                plan = self._evaluate_plan(combo, line_risks)
+                plan["max_line_loading"] = result["max_loading"]
+                plan["overloaded_lines"] = result["overloaded_lines"]
+                ranked.append((None, plan))
+                if len(ranked) == top_k:
+                    return ranked
+        return ranked
+
+    def compute_pareto_frontier(
+        self,
+        weather: dict,
+        max_shutoffs: int = 3,
+        protect_critical: bool = True,
+    ) -> "ParetoFrontier":
+        """
+        Non-dominated shutoff plans over (risk removed ↑, customers affected ↓,
+        critical facilities impacted ↓, grid components ↓).
+
+        All combinations are scored as arrays (_score_all_combinations). Each
+        distinct (customers, critical, components) triple keeps only its
+        highest-risk plans. The survivors then go through a sort-filter
+        skyline pass: in descending-risk order, a point joins the frontier
+        unless an earlier frontier point is at least as good on every other
+        objective. Plan dicts are only built when a page is requested. With
+        protect_critical, plans that cut power to any facility are excluded.
+        """
+        line_risks = self.compute_line_risk_scores(weather)
+        critical_feeders = self.get_critical_load_feeders() if protect_critical else set()
+        candidates = [
+            pl_id for pl_id in self.power_lines.keys()
+            if not protect_critical or pl_id not in critical_feeders
+        ]
+        if not candidates:
+            return ParetoFrontier(self, [], line_risks, {}, np.zeros(0, dtype=np.int64))
+
+        scored = self._score_all_combinations(candidates, line_risks, max_shutoffs)
+        risk = np.round(scored["risk"], 4)
+        costs = np.column_stack([scored["customers"], scored["critical_affected"], scored["num_components"]])
+        feasible = scored["affected"] == 0 if protect_critical else np.ones(len(risk), dtype=bool)
+        if not feasible.any():
+            return ParetoFrontier(self, candidates, line_risks, scored, np.zeros(0, dtype=np.int64))
+
+        # Per cost triple, only the max-risk plans can be non-dominated
+        order = np.flatnonzero(feasible)
+        order = order[np.lexsort((-risk[order], costs[order, 2], costs[order, 1], costs[order, 0]))]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = (costs[order[1:]] != costs[order[:-1]]).any(axis=1)
+        group_max = np.maximum.reduceat(risk[order], np.flatnonzero(first))
+        group_id = np.cumsum(first) - 1
+        survivors = order[risk[order] == group_max[group_id]]
+
+        # Sort-filter skyline: best risk first, cheapest costs first on ties
+        survivors = survivors[np.lexsort((
+            survivors, costs[survivors, 2], costs[survivors, 1], costs[survivors, 0], -risk[survivors],
+        ))]
+        sky_risk = np.empty(len(survivors))
+        sky_costs = np.empty((len(survivors), 3), dtype=costs.dtype)
+        frontier = []
+        for r in survivors:
+            s = len(frontier)
+            if s:
+                no_worse = (sky_costs[:s] <= costs[r]).all(axis=1)
+                strictly_better = (sky_risk[:s] > risk[r]) | (sky_costs[:s] < costs[r]).any(axis=1)
+                if (no_worse & strictly_better).any():
+                    continue
+            sky_risk[s] = risk[r]
+            sky_costs[s] = costs[r]
+            frontier.append(r)
+
+        return ParetoFrontier(self, candidates, line_risks, scored, np.array(frontier, dtype=np.int64))
+
+    def solve_shutoffs_milp(
+        self,
+        weather: dict,
+        max_shutoffs: int = 3,
+        protect_critical: bool = True,
+        max_disruption: float = None,
+        require_connected: bool = False,
+    ) -> list[dict]:
+        """
+        Provably optimal shutoff plan via mixed-integer programming (HiGHS).
+
+        Binary x_e turns line e off, y_f marks facility f as losing power and
+        z marks a fragmented grid. Connectivity is a single-commodity flow
+        from a root substation: every other substation consumes 1 - z units,
+        and a line carries flow only while energized, so z = 0 forces a
+        connected grid. Facility power is a second flow injected only at
+        source substations: non-source substation v consumes w_v, so w_v can
+        reach 1 only when v is still connected to a source, and
+        y_f ≥ 1 - w_(substation of f). The objective maximizes total line
+        risk removed, with a tiny disruption penalty to break ties toward
+        gentler plans.
+
+        Args:
+            weather: Current weather conditions
+            max_shutoffs: Maximum lines to shut off
+            protect_critical: If True, every critical facility stays connected
+                to a source
+            max_disruption: Optional cap on the disruption score
+            require_connected: If True, the grid must stay in one piece
+
+        Returns:
+            A one-element list with the optimal plan (same schema as
+            optimize_shutoffs), or an empty list if the model is infeasible
+        """
+        from scipy.optimize import Bounds, LinearConstraint, milp
+        from scipy.sparse import lil_matrix
+
+        line_risks = self.compute_line_risk_scores(weather)
+        critical_feeders = self.get_critical_load_feeders() if protect_critical else set()
+
+        line_ids = list(self.power_lines)
+        nodes = list(self.graph.nodes)
+        node_pos = {node: i for i, node in enumerate(nodes)}
+        facilities = self.critical_facilities
+        n_e, n_f, n_v = len(line_ids), len(facilities), len(nodes)
+
+        # Variable layout:
+        # [x (lines) | y (facilities) | z | g+ | g- (lines) | h+ | h- (lines) | w (nodes)]
+        X, Y, Z = 0, n_e, n_e + n_f
+        GP, GM = Z + 1, Z + 1 + n_e
+        HP, HM = Z + 1 + 2 * n_e, Z + 1 + 3 * n_e
+        W = Z + 1 + 4 * n_e
+        n_vars = W + n_v
+        big_m = max(n_v - 1, 1)
+        tie_break = 1e-6
+
+        fac_weight = [0.4 * (cf["priority"] == 1) + 0.1 for cf in facilities]
+
+        c = np.zeros(n_vars)
+        c[X:X + n_e] = [-line_risks.get(pl_id, 0) + tie_break * 0.2 for pl_id in line_ids]
+        c[Y:Y + n_f] = [tie_break * w for w in fac_weight]
+        c[Z] = tie_break * 0.3
+
+        rows, lb, ub = [], [], []
+
+        def add_row(coeffs, lo, hi):
+            rows.append(coeffs)
+            lb.append(lo)
+            ub.append(hi)
+
+        # Shutoff budget: 1 ≤ Σx ≤ max_shutoffs
+        add_row({X + e: 1.0 for e in range(n_e)}, 1, max_shutoffs)
+
+        # A facility loses power when its substation is cut off: y_f ≥ 1 - w_v
+        for f, cf in enumerate(facilities):
+            add_row({Y + f: 1.0, W + node_pos[cf["substation"]]: 1.0}, 1, np.inf)
+
+        def net_inflow(v, plus, minus):
+            coeffs = {}
+            for e, pl_id in enumerate(line_ids):
+                u_node, v_node = self.edge_index[pl_id]
+                if node_pos[v_node] == v:      # plus runs u → v, minus runs v → u
+                    coeffs[plus + e] = coeffs.get(plus + e, 0) + 1.0
+                    coeffs[minus + e] = coeffs.get(minus + e, 0) - 1.0
+                if node_pos[u_node] == v:
+                    coeffs[plus + e] = coeffs.get(plus + e, 0) - 1.0
+                    coeffs[minus + e] = coeffs.get(minus + e, 0) + 1.0
+            return coeffs
+
+        # Flow conservation: inflow - outflow + z = 1 at every non-root node
+        for v in range(1, n_v):
+            add_row({**net_inflow(v, GP, GM), Z: 1.0}, 1, 1)
+
+        # Supply flow: inflow - outflow = w_v at every non-source node
+        for v, node in enumerate(nodes):
+            if node not in self.sources:
+                add_row({**net_inflow(v, HP, HM), W + v: -1.0}, 0, 0)
+
+        # De-energized lines carry no flow: g+ + g- ≤ M(1 - x), same for h
+        for e in range(n_e):
+            add_row({GP + e: 1.0, GM + e: 1.0, X + e: big_m}, -np.inf, big_m)
+            add_row({HP + e: 1.0, HM + e: 1.0, X + e: big_m}, -np.inf, big_m)
+
+        if max_disruption is not None:
+            coeffs = {X + e: 0.2 for e in range(n_e)}
+            coeffs.update({Y + f: w for f, w in enumerate(fac_weight)})
+            coeffs[Z] = 0.3
+            add_row(coeffs, -np.inf, max_disruption)
+
+        A = lil_matrix((len(rows), n_vars))
+        for i, coeffs in enumerate(rows):
+            for j, value in coeffs.items():
+                A[i, j] = value
+
+        lower = np.zeros(n_vars)
+        upper = np.concatenate([
+            [0.0 if pl_id in critical_feeders else 1.0 for pl_id in line_ids],
+            np.full(n_f, 0.0 if protect_critical else 1.0),
+            [0.0 if require_connected else 1.0],
+            np.full(4 * n_e, float(big_m)),
+            np.ones(n_v),
+        ])
+        integrality = np.zeros(n_vars)
+        integrality[:Z + 1] = 1
+
+        result = milp(
+            c,
+            constraints=LinearConstraint(A.tocsr(), lb, ub),
+            integrality=integrality,
+            bounds=Bounds(lower, upper),
+        )
+        if result.x is None:
+            return []
+
+        combo = [pl_id for e, pl_id in enumerate(line_ids) if result.x[X + e] > 0.5]
+        plan = self._evaluate_plan(combo, line_risks)
+        plan["confidence"] = round(0.85 + np.random.uniform(0, 0.12), 2)
+        plan["rank"] = 1
+        plan["solver"] = "milp"
+        plan["optimal"] = bool(result.success)
+        return [plan]
+
     def optimize_shutoffs(
         self,
         weather: dict,
         max_shutoffs: int = 3,
         protect_critical: bool = True,
+        top_k: int = 10,
+        solver: str = "search",
+        workers: int = 1,
+        screen_overloads: bool = False,
     ) -> list[dict]:
         """
         Find optimal set of power lines to de-energize.
@@ -146,17 +1148,76 @@ class GridOptimizer:
             While preserving critical load connectivity
             While minimizing grid fragmentation
 
-        Uses brute-force search over combinations (feasible for small grid).
+        Uses a bounded branch-and-bound search over combinations; returns the
+        same plans as brute-force enumeration without visiting pruned subtrees.
         Production version: NVIDIA cuGraph for GPU-accelerated optimization.
 
+        Results are kept in an LRU cache (PLAN_CACHE_SIZE entries) keyed by
+        weather fingerprint and the search settings; each call returns a deep
+        copy, so callers may annotate plans freely.
+
         Args:
             weather: Current weather conditions
             max_shutoffs: Maximum lines to shut off
-            protect_critical: If True, avoid shutting off critical load feeders
+            protect_critical: If True, only plans that keep every critical
+                facility connected to a source are returned
+            top_k: Number of plans to return
+            solver: "search" (branch-and-bound top-K), "vectorized" (score
+                every combination as NumPy arrays; best for ~25 lines and up
+                to 5 shutoffs) or "milp" (single provably optimal plan, see
+                solve_shutoffs_milp)
+            workers: Processes for the "search" solver; above 1, the
+                combination space is sharded across a process pool
+            screen_overloads: If True, drop plans whose DC power flow
+                overloads a remaining line or leaves an island short of
+                supply (see screen_plan_overloads); for "milp" the single
+                optimal plan is dropped if it fails
 
         Returns:
             Ranked list of shutoff plans with risk/impact analysis
         """
+        if solver not in ("search", "vectorized", "milp"):
+            raise ValueError(f"Unknown solver: {solver!r}")
+
+        key = (weather_fingerprint(weather), max_shutoffs, protect_critical, top_k, solver, screen_overloads)
+        with self._cache_lock:
+            plans = self._plan_cache.get(key)
+            if plans is not None:
+                self._plan_cache.move_to_end(key)
+                return copy.deepcopy(plans)
+
+        if solver == "milp":
+            plans = self.solve_shutoffs_milp(weather, max_shutoffs, protect_critical)
+            if screen_overloads:
+                plans = self.screen_plan_overloads(plans)
+        else:
+            plans = self._rank_shutoffs(
+                weather, max_shutoffs, protect_critical, top_k, solver, workers, screen_overloads,
+            )
+
+        with self._cache_lock:
+            self._plan_cache[key] = plans
+            while len(self._plan_cache) > PLAN_CACHE_SIZE:
+                self._plan_cache.popitem(last=False)
+        return copy.deepcopy(plans)
+
+    def _rank_shutoffs(
+        self,
+        weather: dict,
+        max_shutoffs: int,
+        protect_critical: bool,
+        top_k: int,
+        solver: str,
+        workers: int,
+        screen_overloads: bool = False,
+    ) -> list[dict]:
+        """
+        Uncached body of optimize_shutoffs for the "search"/"vectorized" solvers.
+
+        With screening, plans are screened inside the one search, so the
+        result equals filtering the full ranking (up to MAX_SCREENED_PLANS
+        screened plans).
+        """
         line_risks = self.compute_line_risk_scores(weather)
         critical_feeders = self.get_critical_load_feeders() if protect_critical else set()
 
@@ -166,55 +1227,64 @@ class GridOptimizer:
             if not protect_critical or pl_id not in critical_feeders
         ]
 
-        plans = []
-
-        # Evaluate all combinations of 1 to max_shutoffs lines
-        for n in range(1, min(max_shutoffs + 1, len(candidates) + 1)):
-            for combo in combinations(candidates, n):
-                combo_set = set(combo)
-
-                # Compute total risk removed
-                total_risk_removed = sum(line_risks.get(pl_id, 0) for pl_id in combo_set)
+        if solver == "vectorized":
+            ranked = self._vectorized_top_plans(
+                candidates, line_risks, max_shutoffs, top_k, protect_critical, screen_overloads,
+            )
+        elif workers > 1 and len(candidates) > 1:
+            ranked = self._search_top_plans_parallel(
+                candidates, line_risks, max_shutoffs, top_k, workers, protect_critical, screen_overloads,
+            )
+        else:
+            ranked = self._search_top_plans(
+                candidates, line_risks, max_shutoffs, top_k, None, protect_critical, None, screen_overloads,
+            )
+        plans = [plan for _, plan in ranked]
 
-                # Check connectivity impact
-                connectivity = self.check_grid_connectivity(combo_set)
+        # Add rank and confidence
+        for i, plan in enumerate(plans):
+            plan["confidence"] = round(0.85 + np.random.uniform(0, 0.12), 2)
+            plan["rank"] = i + 1
 
-                # Check affected facilities
-                affected = self.get_affected_facilities(combo_set)
-                critical_affected = [f for f in affected if f["severity"] == "CRITICAL"]
+        return plans
 
-                # Compute disruption score
-                disruption = (
-                    len(combo_set) * 0.2 +                                    # lines disabled
-                    (0 if connectivity["connected"] else 0.3) +               # fragmentation
-                    len(critical_affected) * 0.4 +                            # critical impact
-                    len(affected) * 0.1                                       # any facility impact
-                )
+    def get_power_flow(self):
+        """DC power-flow model of this grid, built (and factorized) on first use."""
+        if self._power_flow is None:
+            from power_flow import DCPowerFlow
+            self._power_flow = DCPowerFlow(self.substations, self.power_lines, self.sources)
+        return self._power_flow
 
-                # Risk-reduction-per-disruption ratio (higher = better)
-                efficiency = total_risk_removed / max(disruption, 0.01)
-
-                plans.append({
-                    "lines_disabled": list(combo_set),
-                    "line_names": [self.power_lines[pl_id]["name"] for pl_id in combo_set],
-                    "total_risk_removed": round(total_risk_removed, 4),
-                    "disruption_score": round(disruption, 4),
-                    "efficiency_ratio": round(efficiency, 4),
-                    "grid_connected": connectivity["connected"],
-                    "num_components": connectivity["num_components"],
-                    "affected_facilities": affected,
-                    "critical_facilities_impacted": len(critical_affected),
-                    "confidence": round(0.85 + np.random.uniform(0, 0.12), 2),
-                })
+    def screen_plan_overloads(self, plans: list[dict], limit: float = 1.0) -> list[dict]:
+        """
+        Keep the plans whose post-shutoff DC flows stay within line ratings.
 
-        # Sort by efficiency (best first)
-        plans.sort(key=lambda p: p["efficiency_ratio"], reverse=True)
+        All plans are screened in one batch (DCPowerFlow.screen). Survivors
+        gain 'max_line_loading' (fraction of rating) and 'overloaded_lines'.
+        """
+        if not plans:
+            return []
+        results = self.get_power_flow().screen([plan["lines_disabled"] for plan in plans], limit)
+        kept = []
+        for plan, result in zip(plans, results):
+            if result["feasible"]:
+                plan["max_line_loading"] = result["max_loading"]
+                plan["overloaded_lines"] = result["overloaded_lines"]
+                kept.append(plan)
+        return kept
 
-        # Add rank
-        for i, plan in enumerate(plans):
-            plan["rank"] = i + 1
+    def analyze_contingencies(self, disabled_lines: set = None, depth: int = 1, limit: int = 10) -> dict:
+        """
+        N-1 (and with depth=2, N-2) screening on top of a shutoff plan; see
+        contingency.ContingencyAnalyzer.analyze.
+        """
+        return self._get_contingency_analyzer().analyze(disabled_lines or set(), depth, limit)
 
-        return plans[:10]  # Top 10 plans
+    def _get_contingency_analyzer(self):
+        if self._contingency is None:
+            from contingency import ContingencyAnalyzer
+            self._contingency = ContingencyAnalyzer(self)
+        return self._contingency
 
     def get_grid_summary(self, disabled_lines: set = None) -> dict:
         """Get summary statistics of the grid state."""
@@ -222,17 +1292,129 @@ class GridOptimizer:
         active_lines = [pl for pl_id, pl in self.power_lines.items() if pl_id not in disabled]
         inactive_lines = [pl for pl_id, pl in self.power_lines.items() if pl_id in disabled]
 
-        total_capacity = sum(s["capacity_mw"] for s in SUBSTATIONS)
+        total_capacity = sum(s["capacity_mw"] for s in self.substations.values())
         connectivity = self.check_grid_connectivity(disabled)
 
         return {
-            "total_substations": len(SUBSTATIONS),
-            "total_lines": len(POWER_LINES),
+            "total_substations": len(self.substations),
+            "total_lines": len(self.power_lines),
             "active_lines": len(active_lines),
             "disabled_lines": len(inactive_lines),
             "total_capacity_mw": total_capacity,
             "grid_connected": connectivity["connected"],
             "num_components": connectivity["num_components"],
-            "critical_facilities": len(CRITICAL_FACILITIES),
+            "critical_facilities": len(self.critical_facilities),
             "facilities_impacted": len(self.get_affected_facilities(disabled)),
         }
+
+
+class ParetoFrontier:
+    """
+    Array-backed Pareto frontier of shutoff plans, best risk removed first.
+
+    Objective columns are plain NumPy arrays; page() builds plan dicts for
+    one page at a time so the UI can step through large frontiers.
+    """
+
+    def __init__(self, optimizer: GridOptimizer, candidates: list, line_risks: dict, scored: dict, rows: np.ndarray):
+        self.optimizer = optimizer
+        self.candidates = candidates
+        self.line_risks = line_risks
+        self.combos = scored["combos"][rows] if len(rows) else np.zeros((0, 0), dtype=np.int64)
+        self.risk_removed = scored["risk"][rows] if len(rows) else np.zeros(0)
+        self.customers_affected = scored["customers"][rows] if len(rows) else np.zeros(0, dtype=np.int64)
+        self.critical_impacted = scored["critical_affected"][rows] if len(rows) else np.zeros(0, dtype=np.int64)
+        self.num_components = scored["num_components"][rows] if len(rows) else np.zeros(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.risk_removed)
+
+    def lines(self, i: int) -> list:
+        """Line IDs disabled by frontier plan i."""
+        return [self.candidates[j] for j in self.combos[i] if j >= 0]
+
+    def page(self, page: int = 0, page_size: int = 10) -> list[dict]:
+        """
+        Plan dicts (optimize_shutoffs schema, 'rank' = frontier position)
+        for one page of the frontier.
+        """
+        plans = []
+        for i in range(page * page_size, min((page + 1) * page_size, len(self))):
+            plan = self.optimizer._evaluate_plan(self.lines(i), self.line_risks)
+            plan["rank"] = i + 1
+            plans.append(plan)
+        return plans
+
+
+class _BridgePieces:
+    """
+    De-energized substations after removing a few bridges, from one DFS.
+
+    Each removed bridge cuts off its child's subtree, minus the subtrees of
+    removed bridges nested inside it; each component keeps the rest. Subtrees
+    are contiguous in DFS discovery order, so a dark piece is a handful of
+    slices of the nodes sorted by 'tin'. Cost is O(k log k) plus the output.
+    """
+
+    def __init__(self, d: dict, nodes: list):
+        self.d = d
+        self.by_tin = [nodes[i] for i in np.argsort(d["tin"])]
+        roots = np.flatnonzero(d["parent_edge"] == -1)
+        self.comp_root = dict(zip(d["comp"][roots].tolist(), roots.tolist()))
+        dark = d["comp_src"][d["comp"]] == 0
+        self.base = [nodes[i] for i in np.flatnonzero(dark)]
+
+    def deenergized(self, children: list) -> list:
+        """Dark substations once the bridges above `children` (DFS nodes) are removed."""
+        if not children:
+            return self.base
+        d = self.d
+        tin, tout, src, comp = d["tin"], d["tout"], d["src"], d["comp"]
+        children = sorted(children, key=lambda c: tin[c])
+
+        inner = {c: [] for c in children}
+        piece_src = {c: int(src[c]) for c in children}
+        tops = {}
+        stack = []
+        for c in children:
+            while stack and tout[stack[-1]] <= tin[c]:
+                stack.pop()
+            if stack:
+                inner[stack[-1]].append(c)
+                piece_src[stack[-1]] -= int(src[c])
+            else:
+                tops.setdefault(int(comp[c]), []).append(c)
+            stack.append(c)
+
+        dark = list(self.base)
+
+        def emit(lo, hi, holes):
+            for h in holes:
+                dark.extend(self.by_tin[lo:tin[h]])
+                lo = tout[h]
+            dark.extend(self.by_tin[lo:hi])
+
+        for c in children:
+            if d["comp_src"][comp[c]] > 0 and piece_src[c] == 0:
+                emit(tin[c], tout[c], inner[c])
+        for comp_id, top in tops.items():
+            if d["comp_src"][comp_id] > 0 and d["comp_src"][comp_id] == sum(int(src[c]) for c in top):
+                root = self.comp_root[comp_id]
+                emit(tin[root], tout[root], top)
+        return dark
+
+
+_worker_optimizer = None  # set once per search worker by _init_search_worker
+
+
+def _init_search_worker(optimizer):
+    """Process-pool initializer: keep the grid for every shard this worker runs."""
+    global _worker_optimizer
+    _worker_optimizer = optimizer
+
+
+def _search_shard(candidates, line_risks, max_shutoffs, top_k, roots, protect_critical, threshold, screen_overloads):
+    """Process-pool entry point: one shard of the branch-and-bound search."""
+    return _worker_optimizer._search_top_plans(
+        candidates, line_risks, max_shutoffs, top_k, roots, protect_critical, threshold, screen_overloads,
+    )
@@ -0,0 +1,225 @@
+"""
+EarthDial v3 — DC Power Flow & Overload Screening
+Linearized (DC) power flow on the substation graph. The susceptance matrix is
+factorized once; shutoff plans are screened with PTDF/LODF updates in batches.
+"""
+
+import numpy as np
+
+BASE_MVA = 100.0
+REACTANCE_OHM_PER_KM = 0.4     # typical overhead line, 60-230 kV
+KM_PER_DEG_LAT = 110.54
+KM_PER_DEG_LON_EQUATOR = 111.32
+SINGULAR_TOL = 1e-9
+
+
+def line_reactance_pu(line: dict, substations: dict) -> float:
+    """Per-unit series reactance from line length and voltage (unless given as 'x_pu')."""
+    if "x_pu" in line:
+        return float(line["x_pu"])
+    a, b = substations[line["from"]], substations[line["to"]]
+    mean_lat = np.radians((a["lat"] + b["lat"]) / 2)
+    km = np.hypot(
+        (a["lat"] - b["lat"]) * KM_PER_DEG_LAT,
+        (a["lon"] - b["lon"]) * KM_PER_DEG_LON_EQUATOR * np.cos(mean_lat),
+    )
+    z_base = line["voltage_kv"] ** 2 / BASE_MVA
+    return max(REACTANCE_OHM_PER_KM * km / z_base, 1e-4)
+
+
+class DCPowerFlow:
+    """
+    DC power flow with precomputed sensitivity factors.
+
+    Loads are each substation's 'load_mw'; source substations cover the total
+    load in proportion to their 'capacity_mw'. The reduced susceptance matrix
+    (slack = first source) is LU-factorized once to get the PTDF matrix. The
+    flow change from tripping line k is the column phi_k = PTDF·(e_from - e_to)
+    scaled by the base flow, so an outage set S only needs the |S|×|S| system
+    (I - Phi_SS)·x = f_S; no refactorization per plan.
+    """
+
+    def __init__(self, substations: dict, power_lines: dict, sources: set):
+        from scipy.sparse import csc_matrix, diags
+        from scipy.sparse.linalg import splu
+
+        self.substations = substations
+        self.line_ids = list(power_lines)
+        self.line_pos = {pl_id: e for e, pl_id in enumerate(self.line_ids)}
+        self.nodes = list(substations)
+        node_pos = {node: i for i, node in enumerate(self.nodes)}
+        self.sources = [node for node in self.nodes if node in sources]
+        n_e, n_v = len(self.line_ids), len(self.nodes)
+
+        lines = [power_lines[pl_id] for pl_id in self.line_ids]
+        self.from_idx = np.array([node_pos[pl["from"]] for pl in lines], dtype=np.int64)
+        self.to_idx = np.array([node_pos[pl["to"]] for pl in lines], dtype=np.int64)
+        self.susceptance = np.array([1.0 / line_reactance_pu(pl, substations) for pl in lines])
+        self.rating = np.array([pl.get("rating_mw", np.inf) for pl in lines], dtype=float)
+
+        # Net injections (MW): sources share the total load by capacity
+        self.load = np.array([substations[node].get("load_mw", 0.0) for node in self.nodes], dtype=float)
+        self.capacity = np.array([substations[node]["capacity_mw"] for node in self.nodes], dtype=float)
+        self.is_source = np.array([node in sources for node in self.nodes])
+        self.injection = self._dispatch(np.ones(n_v, dtype=bool)) - self.load
+
+        # Incidence (lines × nodes) and reduced susceptance matrix
+        rows = np.repeat(np.arange(n_e), 2)
+        cols = np.column_stack([self.from_idx, self.to_idx]).ravel()
+        signs = np.tile([1.0, -1.0], n_e)
+        self.incidence = csc_matrix((signs, (rows, cols)), shape=(n_e, n_v))
+        self.slack = node_pos[self.sources[0]] if self.sources else 0
+        keep = np.array([i for i in range(n_v) if i != self.slack], dtype=np.int64)
+        a_r = self.incidence[:, keep]
+        b_r = (a_r.T @ diags(self.susceptance) @ a_r).tocsc()
+
+        # PTDF (lines × nodes, slack column zero) from one factorization
+        self.ptdf = np.zeros((n_e, n_v))
+        if len(keep):
+            lu = splu(b_r)
+            sens = lu.solve(np.asarray((diags(self.susceptance) @ a_r).T.todense()))
+            self.ptdf[:, keep] = sens.T
+
+        # phi[:, k]: flow change on every line per MW moved across line k
+        self.phi = self.ptdf[:, self.from_idx] - self.ptdf[:, self.to_idx]
+        self.base_flow = self.ptdf @ self.injection
+
+    def _dispatch(self, energized: np.ndarray) -> np.ndarray:
+        """Source output covering the energized load, shared by capacity."""
+        gen = np.zeros(len(self.nodes))
+        sources = self.is_source & energized
+        if sources.any():
+            share = self.capacity[sources] / self.capacity[sources].sum()
+            gen[sources] = share * self.load[energized].sum()
+        return gen
+
+    def _island_flows(self, idx: np.ndarray, phi: np.ndarray, system: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Batched flows for outage sets that split the grid.
+
+        Each island is balanced by its own sources (shared by capacity) and
+        islands without one are de-energized, which changes the injections.
+        Island labels for all plans come from one connected_components call
+        on a block-diagonal graph (one copy of the grid per plan). With the
+        re-dispatched injections every island is balanced, so the singular
+        system (I - Phi_SS)·x = f'_S is consistent. Any solution gives the
+        same flows, since flow moved around a cut does not reach the other
+        lines, so a batched pseudo-inverse replaces a solve per island.
+
+        Args:
+            idx: (plans, m) outaged line positions
+            phi: (plans, lines, m) phi columns of the outaged lines
+            system: (plans, m, m) I - Phi_SS
+
+        Returns:
+            (flows, shortfall): (plans × lines) MW, and a per-plan flag for
+            islands whose load exceeds their source capacity
+        """
+        from scipy.sparse import coo_matrix
+        from scipy.sparse.csgraph import connected_components
+
+        n_p, n_v, n_e = len(idx), len(self.nodes), len(self.line_ids)
+        live = np.ones((n_p, n_e), dtype=bool)
+        np.put_along_axis(live, idx, False, axis=1)
+        plan, line = np.nonzero(live)
+        offset = plan * n_v
+        graph = coo_matrix(
+            (np.ones(len(line)), (self.from_idx[line] + offset, self.to_idx[line] + offset)),
+            shape=(n_p * n_v, n_p * n_v),
+        )
+        n_islands, label = connected_components(graph, directed=False)
+
+        # Island totals, gathered back to nodes as (plans, nodes)
+        load = np.tile(self.load, n_p)
+        capacity = np.tile(np.where(self.is_source, self.capacity, 0.0), n_p)
+        island_load = np.bincount(label, load, n_islands)
+        island_capacity = np.bincount(label, capacity, n_islands)
+        island_sources = np.bincount(label, np.tile(self.is_source, n_p), n_islands)
+        island_size = np.bincount(label, minlength=n_islands)
+
+        live_island = island_sources > 0
+        short = live_island & (island_size > 1) & (island_load > island_capacity + 1e-9)
+        shortfall = np.zeros(n_p, dtype=bool)
+        shortfall[np.flatnonzero(short[label]) // n_v] = True
+
+        share = np.divide(capacity, island_capacity[label], out=np.zeros_like(capacity), where=capacity > 0)
+        injection = np.where(live_island[label], share * island_load[label] - load, 0.0).reshape(n_p, n_v)
+
+        base = injection @ self.ptdf.T                                    # (P, lines)
+        f_s = np.take_along_axis(base, idx, axis=1)[:, :, None]
+        # Pseudo-inverse with an absolute cutoff (pinv's rcond is relative,
+        # and the system is all zeros when every outaged line is a bridge)
+        u, sv, vt = np.linalg.svd(system)
+        sv_inv = np.divide(1.0, sv, out=np.zeros_like(sv), where=sv > SINGULAR_TOL)
+        x = (vt.transpose(0, 2, 1) @ (sv_inv[:, :, None] * (u.transpose(0, 2, 1) @ f_s)))[:, :, 0]
+        return base + np.einsum("plm,pm->pl", phi, x), shortfall
+
+    def outage_flows(self, outages: list[list[str]], chunk: int = 1024) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Post-outage line flows for many outage sets at once.
+
+        Sets of equal size are stacked: phi columns are gathered into a
+        (plans, lines, m) block and the m×m systems are solved as one batch.
+        Sets whose system is singular split the grid; they are re-dispatched
+        per island and solved as a batch too (_island_flows).
+
+        Args:
+            outages: Line-ID lists, one per plan
+            chunk: Plans per batched solve
+
+        Returns:
+            (flows, shortfall): (plans × lines) MW with outaged lines at zero,
+            and a per-plan flag for islands whose load exceeds local supply
+        """
+        flows = np.tile(self.base_flow, (len(outages), 1))
+        shortfall = np.zeros(len(outages), dtype=bool)
+
+        by_size = {}
+        for p, lines in enumerate(outages):
+            if lines:
+                by_size.setdefault(len(lines), []).append(p)
+
+        for m, plan_rows in by_size.items():
+            for start in range(0, len(plan_rows), chunk):
+                rows = np.array(plan_rows[start:start + chunk])
+                idx = np.array([[self.line_pos[pl_id] for pl_id in outages[p]] for p in rows])
+                phi = self.phi[:, idx].transpose(1, 0, 2)                 # (P, lines, m)
+                system = np.eye(m) - np.take_along_axis(phi, idx[:, :, None], axis=1)
+                singular = np.abs(np.linalg.det(system)) < SINGULAR_TOL
+                ok = ~singular
+                if ok.any():
+                    x = np.linalg.solve(system[ok], self.base_flow[idx[ok]][:, :, None])[:, :, 0]
+                    flows[rows[ok]] += np.einsum("plm,pm->pl", phi[ok], x)
+                if singular.any():
+                    flows[rows[singular]], shortfall[rows[singular]] = self._island_flows(
+                        idx[singular], phi[singular], system[singular],
+                    )
+                flows[rows[:, None], idx] = 0.0
+
+        return flows, shortfall
+
+    def screen(self, outages: list[list[str]], limit: float = 1.0) -> list[dict]:
+        """
+        Overload screening for shutoff plans.
+
+        Args:
+            outages: Line-ID lists, one per plan
+            limit: Allowed loading as a fraction of 'rating_mw'
+
+        Returns:
+            Per plan: 'feasible', 'max_loading' (fraction of rating),
+            'overloaded_lines' and 'supply_shortfall'
+        """
+        flows, shortfall = self.outage_flows(outages)
+        loading = np.abs(flows) / self.rating
+        max_loading = loading.max(axis=1) if len(self.line_ids) else np.zeros(len(outages))
+        results = []
+        for p in range(len(outages)):
+            over = np.flatnonzero(loading[p] > limit)
+            results.append({
+                "feasible": not len(over) and not shortfall[p],
+                "max_loading": round(float(max_loading[p]), 4),
+                "overloaded_lines": [self.line_ids[e] for e in over],
+                "supply_shortfall": bool(shortfall[p]),
+            })
+        return results
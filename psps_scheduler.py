@@ -0,0 +1,233 @@
+"""
+EarthDial v3 — Rolling PSPS Schedule Optimizer
+Time-expanded Public Safety Power Shutoff planning: per-hour de-energization
+windows over a forecast timeline, solved as one shortest path through a
+trellis of shutoff states instead of one optimization per hour.
+"""
+
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+from config import WEATHER
+
+RISK_THRESHOLD = 0.25          # weather-driven line risk above this counts toward risk-hours
+CUSTOMER_HOUR_WEIGHT = 1e-5    # risk units per customer-hour of outage
+SWITCH_COST = 0.05             # risk units per line opened or closed
+PLANS_PER_HOUR = 20            # static optimizer plans kept as states per hour
+
+# Reference conditions for the weather-driven part of line risk
+CALM_WEATHER = {"wind_speed_mph": 0, "wind_gust_mph": 0, "humidity_pct": 50, "red_flag": False}
+
+
+def hourly_weather(weather_timeline: pd.DataFrame, base: dict = None) -> list[dict]:
+    """One weather dict per timeline row: the base weather overridden by the row."""
+    base = base or WEATHER
+    columns = [c for c in weather_timeline.columns if c != "hour"]
+    return [
+        {**base, **{c: (v.item() if hasattr(v, "item") else v) for c, v in zip(columns, row)}}
+        for row in weather_timeline[columns].itertuples(index=False)
+    ]
+
+
+def hourly_top_plans(
+    optimizer,
+    candidates: list,
+    hourly_scores: list[dict],
+    max_shutoffs: int,
+    top_k: int,
+    protect_critical: bool = True,
+) -> set[frozenset]:
+    """
+    Union over hours of the static optimizer's top_k shutoff plans.
+
+    Each hour is a full search; the hours share only the weather-
+    independent connectivity structure (ContingencyAnalyzer.intact),
+    which is built once.
+
+    Args:
+        optimizer: GridOptimizer
+        candidates: Lines that may be de-energized
+        hourly_scores: compute_line_risk_scores output, one dict per hour
+        max_shutoffs: Maximum lines per plan
+        top_k: Plans kept per hour
+
+    Returns:
+        Set of plans (frozensets of line IDs)
+    """
+    plans = set()
+    if not candidates or max_shutoffs <= 0 or top_k <= 0:
+        return plans
+    for scores in hourly_scores:
+        ranked = optimizer._search_top_plans(candidates, scores, max_shutoffs, top_k, None, protect_critical)
+        plans.update(frozenset(plan["lines_disabled"]) for _, plan in ranked)
+    return plans
+
+
+def optimize_psps_schedule(
+    weather_timeline: pd.DataFrame,
+    optimizer=None,
+    max_shutoffs: int = 3,
+    protect_critical: bool = True,
+    max_switches_per_hour: int = 2,
+    risk_threshold: float = RISK_THRESHOLD,
+    customer_hour_weight: float = CUSTOMER_HOUR_WEIGHT,
+    switch_cost: float = SWITCH_COST,
+    plans_per_hour: int = PLANS_PER_HOUR,
+) -> dict:
+    """
+    De-energization schedule for an hourly forecast by dynamic programming.
+
+    States are the shutoff sets the static optimizer ranks highest in some
+    hour: the top plans_per_hour plans of GridOptimizer's branch-and-bound
+    search under each hour's line scores, plus all their subsets (so the
+    switching limit can step into and out of them) and the all-energized
+    set. Each hour is searched in full; only the grid structure is shared
+    across hours (see hourly_top_plans).
+
+    Each state's hourly cost is
+
+        cost(h, S) = Σ_energized max(0, risk_h − risk_calm − risk_threshold)
+                     + customer_hour_weight · customers(S)
+
+    where risk_calm is the line's score under CALM_WEATHER. Vegetation,
+    age and terrain keep line scores well above zero in any weather, so
+    the threshold applies to the weather-driven part only; otherwise calm
+    hours count as risk-hours and windows stretch over the whole forecast.
+
+    Moving from S to S' costs switch_cost per toggled line and is allowed
+    only if at most max_switches_per_hour lines toggle. Viterbi over the
+    hours (starting all energized) returns the minimum-cost sequence over
+    these states.
+
+    Args:
+        weather_timeline: Hourly forecast (data_generator.generate_weather_timeline)
+        optimizer: GridOptimizer (default: one on the config grid)
+        max_shutoffs: Maximum lines de-energized in any hour
+        protect_critical: Only allow states that keep every critical
+            facility connected to a source
+        max_switches_per_hour: Lines that may be opened or closed between
+            consecutive hours
+        risk_threshold: Weather-driven line risk (above calm conditions)
+            that counts as acceptable
+        customer_hour_weight: Cost of one customer-hour of outage, in risk units
+        switch_cost: Cost of one switching operation, in risk units
+        plans_per_hour: Static optimizer plans taken as states from each hour
+
+    Returns:
+        Dict with 'hourly' (DataFrame: hour, lines_disabled, switches,
+        risk_hours, customers_out), 'windows' (one dict per contiguous
+        de-energization of a line: line_id, line_name, start_hour,
+        end_hour (exclusive), hours, customers) and 'totals'
+        (risk_hours, baseline_risk_hours, customer_outage_hours, switches)
+    """
+    if optimizer is None:
+        from grid_optimizer import GridOptimizer
+        optimizer = GridOptimizer()
+
+    hours = hourly_weather(weather_timeline)
+    hour_labels = (
+        weather_timeline["hour"].to_numpy() if "hour" in weather_timeline else np.arange(len(hours))
+    )
+    line_ids = list(optimizer.power_lines)
+    hourly_scores = [optimizer.compute_line_risk_scores(wx) for wx in hours]
+    line_risk = np.array([
+        [scores[pl_id] for pl_id in line_ids] for scores in hourly_scores
+    ]).reshape(len(hours), len(line_ids))
+    calm_scores = optimizer.compute_line_risk_scores({**WEATHER, **CALM_WEATHER})
+    calm = np.array([calm_scores[pl_id] for pl_id in line_ids])
+    excess = np.maximum(line_risk - calm - risk_threshold, 0.0)   # (hours, lines)
+    baseline = excess.sum(axis=1)
+
+    # ── States: the static optimizer's top plans, hour by hour ──────────────
+    critical_feeders = optimizer.get_critical_load_feeders() if protect_critical else set()
+    candidates = [
+        pl_id for pl_id in line_ids
+        if not protect_critical or pl_id not in critical_feeders
+    ]
+    plans = hourly_top_plans(optimizer, candidates, hourly_scores, max_shutoffs, plans_per_hour, protect_critical)
+
+    # Subsets of a plan are states too; fewer lines off never cuts off more
+    position = {pl_id: i for i, pl_id in enumerate(line_ids)}
+    states = {()}
+    for plan in plans:
+        lines = sorted(position[pl_id] for pl_id in plan)
+        states.update(subset for m in range(1, len(lines) + 1) for subset in combinations(lines, m))
+    states = sorted(states, key=lambda state: (len(state), state))       # row 0: all energized
+    width = max(1, max_shutoffs)
+    states = np.array([list(state) + [-1] * (width - len(state)) for state in states], dtype=np.int64)
+    customers = np.array([
+        sum(optimizer.power_lines[line_ids[j]].get("customers", 0) for j in state if j >= 0)
+        for state in states
+    ], dtype=float)
+
+    # Hourly state cost: gather-sum of the excess risk each state removes
+    padded = np.hstack([excess, np.zeros((len(hours), 1))])
+    stage = (
+        baseline[:, None]
+        - padded[:, states].sum(axis=2)
+        + customer_hour_weight * customers[None, :]
+    )
+
+    # ── Transitions: lines toggled between two states ───────────────────────
+    incidence = np.zeros((len(states), len(line_ids) + 1), dtype=np.int64)
+    np.put_along_axis(incidence, np.where(states >= 0, states, len(line_ids)), 1, axis=1)
+    incidence = incidence[:, :-1]
+    sizes = incidence.sum(axis=1)
+    toggles = sizes[:, None] + sizes[None, :] - 2 * (incidence @ incidence.T)
+    transition = np.where(toggles <= max_switches_per_hour, switch_cost * toggles, np.inf)
+
+    # ── Viterbi ─────────────────────────────────────────────────────────────
+    cost = np.full(len(states), np.inf)
+    cost[0] = 0.0
+    back = np.zeros((len(hours), len(states)), dtype=np.int64)
+    for h in range(len(hours)):
+        total = cost[:, None] + transition                            # (from, to)
+        back[h] = total.argmin(axis=0)
+        cost = total[back[h], np.arange(len(states))] + stage[h]
+
+    path = np.zeros(len(hours), dtype=np.int64)
+    if len(hours):
+        path[-1] = int(np.argmin(cost))
+        for h in range(len(hours) - 1, 0, -1):
+            path[h - 1] = back[h, path[h]]
+
+    # ── Schedule ────────────────────────────────────────────────────────────
+    off = incidence[path].astype(bool)                                # (hours, lines)
+    previous = np.vstack([np.zeros((1, len(line_ids)), dtype=bool), off[:-1]])
+    switches = (off != previous).sum(axis=1)
+    risk_hours = (excess * ~off).sum(axis=1)
+    customers_out = customers[path]
+
+    hourly = pd.DataFrame({
+        "hour": hour_labels,
+        "lines_disabled": [[line_ids[j] for j in np.flatnonzero(row)] for row in off],
+        "switches": switches,
+        "risk_hours": np.round(risk_hours, 4),
+        "customers_out": customers_out.astype(np.int64),
+    })
+
+    windows = []
+    for j, pl_id in enumerate(line_ids):
+        edges = np.diff(np.concatenate([[0], off[:, j].astype(np.int8), [0]]))
+        for start, end in zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)):
+            windows.append({
+                "line_id": pl_id,
+                "line_name": optimizer.power_lines[pl_id]["name"],
+                "start_hour": int(hour_labels[start]),
+                "end_hour": int(hour_labels[end - 1]) + 1,
+                "hours": int(end - start),
+                "customers": optimizer.power_lines[pl_id].get("customers", 0),
+            })
+    windows.sort(key=lambda w: (w["start_hour"], w["line_id"]))
+
+    return {
+        "hourly": hourly,
+        "windows": windows,
+        "totals": {
+            "risk_hours": round(float(risk_hours.sum()), 4),
+            "baseline_risk_hours": round(float(baseline.sum()), 4),
+            "customer_outage_hours": int(customers_out.sum()),
+            "switches": int(switches.sum()),
+        },
+    }
@@ -0,0 +1,268 @@
+"""
+EarthDial v3 — DEM / Fuel Raster Ingestion
+Loads real elevation and fuel layers from local rasters (GeoTIFF, NetCDF, npz)
+onto the configured terrain grid, reading only the window around the grid.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from config import (
+    CENTER_LAT, CENTER_LON, GRID_ROWS, GRID_COLS,
+    GRID_STEP_LAT, GRID_STEP_LON,
+)
+
+METERS_PER_DEG_LAT = 110_540.0
+METERS_PER_DEG_LON_EQUATOR = 111_320.0
+
+
+def grid_coordinates(
+    rows: int = GRID_ROWS,
+    cols: int = GRID_COLS,
+    center_lat: float = CENTER_LAT,
+    center_lon: float = CENTER_LON,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Cell-center latitudes (per row) and longitudes (per column) of the grid."""
+    lats = center_lat - (rows / 2 - np.arange(rows)) * GRID_STEP_LAT
+    lons = center_lon - (cols / 2 - np.arange(cols)) * GRID_STEP_LON
+    return lats, lons
+
+
+def _coord_slice(coords: np.ndarray, lo: float, hi: float) -> slice:
+    """Index slice covering [lo, hi] plus one cell of padding (any sort order)."""
+    inside = np.nonzero((coords >= lo) & (coords <= hi))[0]
+    if inside.size == 0:
+        # Window smaller than one source cell: take the nearest cells
+        nearest = int(np.argmin(np.abs(coords - (lo + hi) / 2)))
+        inside = np.array([nearest])
+    start = max(0, int(inside[0]) - 1)
+    stop = min(len(coords), int(inside[-1]) + 2)
+    return slice(start, stop)
+
+
+def _read_geotiff_window(path, south, north, west, east, variable=None):
+    try:
+        import rasterio
+        from rasterio.windows import Window, from_bounds
+    except ImportError as e:
+        raise ImportError("GeoTIFF ingestion requires rasterio (pip install rasterio)") from e
+
+    with rasterio.open(path) as src:
+        if src.crs is not None and not src.crs.is_geographic:
+            raise ValueError(f"{path}: expected a geographic (lat/lon) CRS, got {src.crs}; reproject first")
+
+        win = from_bounds(west, south, east, north, transform=src.transform)
+        win = win.round_offsets(op="floor").round_lengths(op="ceil")
+        win = Window(win.col_off - 1, win.row_off - 1, win.width + 2, win.height + 2)
+        win = win.intersection(Window(0, 0, src.width, src.height))
+
+        band = 1 if variable is None else int(variable)
+        data = src.read(band, window=win, masked=True).astype(float).filled(np.nan)
+        t = src.window_transform(win)
+
+    lons = t.c + t.a * (np.arange(data.shape[1]) + 0.5)
+    lats = t.f + t.e * (np.arange(data.shape[0]) + 0.5)
+    return data, lats, lons
+
+
+def _find_coord(names, candidates):
+    for name in candidates:
+        if name in names:
+            return name
+    raise ValueError(f"Could not find a coordinate among {candidates}")
+
+
+def _read_netcdf_window(path, south, north, west, east, variable=None):
+    try:
+        import xarray as xr
+    except ImportError as e:
+        raise ImportError("NetCDF ingestion requires xarray and netCDF4 (pip install xarray netCDF4)") from e
+
+    with xr.open_dataset(path) as ds:
+        da = ds[variable] if variable else ds[next(iter(ds.data_vars))]
+        lat_name = _find_coord(da.coords, ("lat", "latitude", "y"))
+        lon_name = _find_coord(da.coords, ("lon", "longitude", "x"))
+        lats = da[lat_name].values
+        lons = da[lon_name].values
+        rs = _coord_slice(lats, south, north)
+        cs = _coord_slice(lons, west, east)
+        # Only the selected window is pulled from disk
+        window = da.isel({lat_name: rs, lon_name: cs}).transpose(lat_name, lon_name)
+        data = window.values.astype(float)
+
+    return data, lats[rs], lons[cs]
+
+
+def _read_npz_window(path, south, north, west, east, variable=None):
+    """
+    npz rasters hold a 2-D array plus 1-D 'lat' and 'lon' coordinates.
+    Members are stored whole inside the archive, so use GeoTIFF or NetCDF
+    for statewide layers; npz is for small, pre-clipped extracts.
+    """
+    with np.load(path) as npz:
+        lats = npz["lat"]
+        lons = npz["lon"]
+        key = variable or next(k for k in npz.files if k not in ("lat", "lon"))
+        rs = _coord_slice(lats, south, north)
+        cs = _coord_slice(lons, west, east)
+        data = np.asarray(npz[key][rs, cs], dtype=float)
+    return data, lats[rs], lons[cs]
+
+
+_READERS = {
+    ".tif": _read_geotiff_window,
+    ".tiff": _read_geotiff_window,
+    ".nc": _read_netcdf_window,
+    ".nc4": _read_netcdf_window,
+    ".npz": _read_npz_window,
+}
+
+
+def read_raster_window(path: str, south: float, north: float, west: float, east: float, variable=None):
+    """
+    Read the part of a raster covering the given bounds (plus one cell of
+    padding for interpolation).
+
+    Args:
+        path: GeoTIFF (.tif/.tiff), NetCDF (.nc/.nc4) or npz raster
+        south, north, west, east: Bounds in degrees
+        variable: Band number (GeoTIFF), variable name (NetCDF) or array key (npz)
+
+    Returns:
+        (values, lats, lons) — 2-D window with NaN for nodata, and the
+        cell-center coordinates of its rows and columns
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in _READERS:
+        raise ValueError(f"Unsupported raster format: {ext} (expected one of {sorted(_READERS)})")
+    return _READERS[ext](path, south, north, west, east, variable)
+
+
+def resample_bilinear(
+    values: np.ndarray,
+    src_lats: np.ndarray,
+    src_lons: np.ndarray,
+    tgt_lats: np.ndarray,
+    tgt_lons: np.ndarray,
+) -> np.ndarray:
+    """
+    Bilinearly resample a lat/lon raster onto target row/column coordinates.
+    Targets outside the source are clamped to the edge; NaNs are filled with
+    the window mean.
+
+    Returns:
+        Array of shape (len(tgt_lats), len(tgt_lons))
+    """
+    if src_lats[0] > src_lats[-1]:
+        values, src_lats = values[::-1], src_lats[::-1]
+    if src_lons[0] > src_lons[-1]:
+        values, src_lons = values[:, ::-1], src_lons[::-1]
+
+    if np.isnan(values).any():
+        fill = np.nanmean(values) if np.isfinite(values).any() else 0.0
+        values = np.where(np.isnan(values), fill, values)
+
+    fi = np.interp(tgt_lats, src_lats, np.arange(len(src_lats)))
+    fj = np.interp(tgt_lons, src_lons, np.arange(len(src_lons)))
+    i0 = np.minimum(np.floor(fi).astype(int), len(src_lats) - 1)
+    j0 = np.minimum(np.floor(fj).astype(int), len(src_lons) - 1)
+    i1 = np.minimum(i0 + 1, len(src_lats) - 1)
+    j1 = np.minimum(j0 + 1, len(src_lons) - 1)
+    wi = (fi - i0)[:, None]
+    wj = (fj - j0)[None, :]
+
+    return (
+        (1 - wi) * (1 - wj) * values[np.ix_(i0, j0)] +
+        (1 - wi) * wj * values[np.ix_(i0, j1)] +
+        wi * (1 - wj) * values[np.ix_(i1, j0)] +
+        wi * wj * values[np.ix_(i1, j1)]
+    )
+
+
+def compute_slope_degrees(elevation: np.ndarray, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Terrain slope (degrees) from the elevation gradient on a lat/lon raster."""
+    mean_lat = np.radians(np.mean(lats))
+    y_m = lats * METERS_PER_DEG_LAT
+    x_m = lons * METERS_PER_DEG_LON_EQUATOR * np.cos(mean_lat)
+    dz_dy = np.gradient(elevation, y_m, axis=0) if len(lats) > 1 else np.zeros_like(elevation)
+    dz_dx = np.gradient(elevation, x_m, axis=1) if len(lons) > 1 else np.zeros_like(elevation)
+    return np.degrees(np.arctan(np.hypot(dz_dx, dz_dy)))
+
+
+def load_terrain_from_rasters(
+    elevation_path: str,
+    fuel_density_path: str = None,
+    fuel_moisture_path: str = None,
+    rows: int = GRID_ROWS,
+    cols: int = GRID_COLS,
+    center_lat: float = CENTER_LAT,
+    center_lon: float = CENTER_LON,
+    elevation_variable=None,
+    fuel_density_variable=None,
+    fuel_moisture_variable=None,
+) -> pd.DataFrame:
+    """
+    Build the terrain grid from local DEM and fuel rasters.
+
+    Only the window covering the grid bounds is read from each raster.
+    Slope is computed from the DEM gradient at native resolution before
+    resampling to GRID_STEP_LAT/GRID_STEP_LON. Layers that are not supplied
+    fall back to the same relationships the synthetic generator uses.
+
+    Args:
+        elevation_path: DEM raster in meters
+        fuel_density_path: Fuel density / canopy cover raster (0-1, or 0-100 %)
+        fuel_moisture_path: Dead fuel moisture raster (fraction, or %)
+        rows, cols, center_lat, center_lon: Target grid (defaults from config)
+        *_variable: Band / variable / key to read from each raster
+
+    Returns:
+        DataFrame with the same columns as generate_terrain_grid
+    """
+    lats, lons = grid_coordinates(rows, cols, center_lat, center_lon)
+    bounds = (
+        lats.min() - GRID_STEP_LAT / 2, lats.max() + GRID_STEP_LAT / 2,
+        lons.min() - GRID_STEP_LON / 2, lons.max() + GRID_STEP_LON / 2,
+    )
+
+    dem, dem_lats, dem_lons = read_raster_window(elevation_path, *bounds, variable=elevation_variable)
+    elevation = resample_bilinear(dem, dem_lats, dem_lons, lats, lons)
+    slope = resample_bilinear(
+        compute_slope_degrees(np.nan_to_num(dem, nan=np.nanmean(dem)), dem_lats, dem_lons),
+        dem_lats, dem_lons, lats, lons,
+    )
+
+    if fuel_density_path:
+        fuel, f_lats, f_lons = read_raster_window(fuel_density_path, *bounds, variable=fuel_density_variable)
+        if np.nanmax(fuel) > 1.0:
+            fuel = fuel / 100.0  # percent cover
+        fuel_density = resample_bilinear(fuel, f_lats, f_lons, lats, lons)
+    else:
+        fuel_density = 0.3 + 0.5 * (elevation / 500)
+    fuel_density = np.clip(fuel_density, 0.05, 1.0)
+
+    if fuel_moisture_path:
+        moist, m_lats, m_lons = read_raster_window(fuel_moisture_path, *bounds, variable=fuel_moisture_variable)
+        if np.nanmax(moist) > 1.0:
+            moist = moist / 100.0  # percent moisture content
+        fuel_moisture = resample_bilinear(moist, m_lats, m_lons, lats, lons)
+    else:
+        fuel_moisture = 0.08 + 0.1 * (1 - fuel_density)
+    fuel_moisture = np.clip(fuel_moisture, 0.03, 0.25)
+
+    wind_exposure = np.clip(0.3 + 0.7 * (elevation / 500), 0.1, 1.0)
+
+    ii, jj = np.meshgrid(np.arange(rows), np.arange(cols), indexing="ij")
+    lat_grid, lon_grid = np.meshgrid(lats, lons, indexing="ij")
+
+    return pd.DataFrame({
+        "lat": np.round(lat_grid.ravel(), 6),
+        "lon": np.round(lon_grid.ravel(), 6),
+        "elevation": np.round(elevation.ravel(), 1),
+        "slope": np.round(np.clip(slope, 0, 45).ravel(), 1),
+        "fuel_density": np.round(fuel_density.ravel(), 3),
+        "fuel_moisture": np.round(fuel_moisture.ravel(), 3),
+        "wind_exposure": np.round(wind_exposure.ravel(), 3),
+        "grid_i": ii.ravel(),
+        "grid_j": jj.ravel(),
+    })
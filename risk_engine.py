@@ -1,63 +1,43 @@
 """
 EarthDial v3 — Ignition Risk Engine & Fire Spread Modeling
-Computes spatially-resolved ignition risk and projected fire spread cones.
+Computes spatially-resolved ignition risk and projected fire spread, either
+as analytic cones or as minimum-travel-time isochrones over the terrain raster.
 """
 
 import numpy as np
 import pandas as pd
-from config import RISK_WEIGHTS, WEATHER
+from config import RISK_WEIGHTS, WEATHER, COLORS, GRID_STEP_LAT
+from data_generator import compute_powerline_proximity
 
 
-def compute_ignition_risk(
-    terrain_df: pd.DataFrame,
-    powerline_proximity: np.ndarray,
-    weather: dict = None,
-    disabled_lines: set = None,
-) -> pd.DataFrame:
+def _static_risk(terrain_df: pd.DataFrame, wx: dict, noise_seed=42) -> np.ndarray:
     """
-    Compute ignition risk index for each terrain cell.
-
-    Risk = weighted combination of:
-        - Wind speed / exposure
-        - Low humidity
-        - Fuel density
-        - Low fuel moisture
-        - Steep slope
-        - Power line proximity (reduced when lines are de-energized)
-
-    Args:
-        terrain_df: Terrain grid with fuel/slope/exposure data
-        powerline_proximity: Array of proximity scores to active power lines
-        weather: Weather dict override (defaults to config WEATHER)
-        disabled_lines: Set of power line IDs that are shut off
+    Unclipped ignition risk from every factor except power line proximity.
 
-    Returns:
-        terrain_df with added 'ignition_risk' and 'risk_category' columns
+    Proximity enters the index linearly, so callers add
+    ``RISK_WEIGHTS["powerline_proximity"] * proximity`` and clip to 0-1.
+    Weather values may be (hours, 1) arrays to broadcast a whole timeline
+    against the cells, giving an (hours, cells) result.
     """
-    wx = weather or WEATHER
     w = RISK_WEIGHTS
-    df = terrain_df.copy()
 
     # ── Normalize inputs to 0-1 ──────────────────────────────────────────────
 
     # Wind risk: higher speed + higher exposure = more risk
     wind_normalized = np.clip(wx["wind_speed_mph"] / 80, 0, 1)
-    wind_risk = wind_normalized * df["wind_exposure"].values
+    wind_risk = wind_normalized * terrain_df["wind_exposure"].values
 
     # Humidity risk: lower humidity = higher risk (inverted)
     humidity_risk = np.clip(1.0 - wx["humidity_pct"] / 50, 0, 1)
 
     # Fuel density risk
-    fuel_risk = df["fuel_density"].values
+    fuel_risk = terrain_df["fuel_density"].values
 
     # Fuel moisture risk: lower moisture = higher risk (inverted)
-    moisture_risk = np.clip(1.0 - df["fuel_moisture"].values / 0.25, 0, 1)
+    moisture_risk = np.clip(1.0 - terrain_df["fuel_moisture"].values / 0.25, 0, 1)
 
     # Slope risk: steeper = more risk
-    slope_risk = np.clip(df["slope"].values / 40, 0, 1)
-
-    # Power line proximity (already 0-1)
-    pl_risk = powerline_proximity
+    slope_risk = np.clip(terrain_df["slope"].values / 40, 0, 1)
 
     # ── Weighted combination ─────────────────────────────────────────────────
     risk = (
@@ -65,8 +45,7 @@ def compute_ignition_risk(
         w["humidity"] * humidity_risk +
         w["fuel_density"] * fuel_risk +
         w["fuel_moisture"] * moisture_risk +
-        w["slope"] * slope_risk +
-        w["powerline_proximity"] * pl_risk
+        w["slope"] * slope_risk
     )
 
     # Non-linear boost: compound risk factors amplify each other
@@ -76,34 +55,87 @@ def compute_ignition_risk(
     risk = risk + compound_boost + exposure_boost
 
     # Add small random perturbation for realism
-    np.random.seed(42)
-    risk += np.random.normal(0, 0.03, len(risk))
-    risk = np.clip(risk, 0, 1)
+    np.random.seed(noise_seed)
+    risk = risk + np.random.normal(0, 0.03, len(terrain_df))
 
-    df["ignition_risk"] = np.round(risk, 4)
+    return risk
 
-    # Categorize
-    df["risk_category"] = pd.cut(
-        df["ignition_risk"],
-        bins=[0, 0.3, 0.55, 0.75, 1.0],
-        labels=["Low", "Moderate", "High", "Extreme"],
-    )
 
-    # Color mapping for visualization
-    def risk_color(r):
-        if r < 0.3:
-            return [46, 204, 113, 140]   # green
-        elif r < 0.55:
-            return [241, 196, 15, 160]   # yellow
-        elif r < 0.75:
-            return [231, 76, 60, 180]    # red
-        else:
-            return [192, 57, 43, 220]    # dark red
+# ─── Risk Bands ─────────────────────────────────────────────────────────────
+RISK_LABELS = ["Low", "Moderate", "High", "Extreme"]
+RISK_BIN_EDGES = np.array([0.3, 0.55, 0.75])
+RISK_COLOR_COLUMNS = ["risk_color_r", "risk_color_g", "risk_color_b", "risk_color_a"]
+
+# RGBA lookup table indexed by band (alpha grows with severity)
+RISK_COLOR_LUT = np.array([
+    COLORS["risk_low"] + [140],
+    COLORS["risk_medium"] + [160],
+    COLORS["risk_high"] + [180],
+    COLORS["risk_extreme"] + [220],
+], dtype=np.uint8)
+
+
+def risk_style(ignition_risk) -> tuple[pd.Categorical, np.ndarray, np.ndarray]:
+    """
+    Category, color and column height for each risk value, fully vectorized.
 
-    df["risk_color"] = df["ignition_risk"].apply(risk_color)
+    Categories use right-closed bins (0.3 is Low); colors use left-closed
+    bins (0.3 is yellow), matching the original per-row mapping.
 
+    Returns:
+        (risk_category, N × 4 uint8 RGBA colors, int risk_height)
+    """
+    r = np.asarray(ignition_risk, dtype=float)
+    category = pd.Categorical.from_codes(
+        np.searchsorted(RISK_BIN_EDGES, r, side="left"), categories=RISK_LABELS, ordered=True,
+    )
+    colors = RISK_COLOR_LUT[np.searchsorted(RISK_BIN_EDGES, r, side="right")]
     # Column height for 3D (exaggerated for visual impact)
-    df["risk_height"] = (df["ignition_risk"] * 800).astype(int)
+    height = (r * 800).astype(int)
+    return category, colors, height
+
+
+def compute_ignition_risk(
+    terrain_df: pd.DataFrame,
+    powerline_proximity: np.ndarray,
+    weather: dict = None,
+    disabled_lines: set = None,
+) -> pd.DataFrame:
+    """
+    Compute ignition risk index for each terrain cell.
+
+    Risk = weighted combination of:
+        - Wind speed / exposure
+        - Low humidity
+        - Fuel density
+        - Low fuel moisture
+        - Steep slope
+        - Power line proximity (reduced when lines are de-energized)
+
+    Args:
+        terrain_df: Terrain grid with fuel/slope/exposure data
+        powerline_proximity: Array of proximity scores to active power lines
+        weather: Weather dict override (defaults to config WEATHER)
+        disabled_lines: Set of power line IDs that are shut off
+
+    Returns:
+        terrain_df with added 'ignition_risk', 'risk_category', RGBA
+        'risk_color_*' and height columns
+    """
+    # Shallow: only the new columns are allocated; the terrain stays shared
+    df = terrain_df.copy(deep=False)
+
+    risk = _static_risk(df, weather or WEATHER)
+    risk = np.clip(risk + RISK_WEIGHTS["powerline_proximity"] * powerline_proximity, 0, 1)
+
+    df["ignition_risk"] = np.round(risk, 4)
+
+    # Categorize, color (uint8 RGBA columns) and height in one pass
+    category, colors, height = risk_style(df["ignition_risk"].to_numpy())
+    df["risk_category"] = category
+    for k, col in enumerate(RISK_COLOR_COLUMNS):
+        df[col] = colors[:, k]
+    df["risk_height"] = height
 
     # Elevation-scaled height for terrain layer
     df["terrain_height"] = (df["elevation"] * 2).astype(int)
@@ -111,6 +143,477 @@ def compute_ignition_risk(
     return df
 
 
+def compute_batch_ignition_risk(
+    terrain_df: pd.DataFrame,
+    basis,
+    disabled_line_sets: list,
+    weather: dict = None,
+) -> dict:
+    """
+    Evaluate K counterfactual shutoff plans against the terrain in one pass.
+
+    The non-proximity risk terms are computed once; each plan only changes
+    which columns of the proximity basis take part in the max.
+
+    Args:
+        terrain_df: Terrain grid with fuel/slope/exposure data
+        basis: data_generator.ProximityBasis for this terrain and line set
+        disabled_line_sets: K iterables of power line IDs to shut off
+        weather: Weather dict override (defaults to config WEATHER)
+
+    Returns:
+        Dict with a K × cells float32 'risk' matrix and per-plan arrays
+        'mean_risk', 'extreme_cells', 'high_risk_cells', 'reduction_pct'
+        and 'extreme_cells_eliminated' (relative to all lines energized).
+    """
+    static = _static_risk(terrain_df, weather or WEATHER)
+    w_pl = RISK_WEIGHTS["powerline_proximity"]
+
+    active = np.array(
+        [~basis.line_mask(disabled) for disabled in disabled_line_sets], dtype=bool,
+    ).reshape(-1, len(basis.line_ids))
+
+    baseline = np.round(np.clip(static + w_pl * basis.matrix.max(axis=1, initial=0.0), 0, 1), 4)
+
+    # Masked max over lines, one K × cells pass per line (proximity is ≥ 0,
+    # so zeroing a disabled column is the same as excluding it)
+    proximity = np.zeros((len(active), basis.matrix.shape[0]))
+    for j in range(basis.matrix.shape[1]):
+        np.maximum(proximity, active[:, j, None] * basis.matrix[None, :, j], out=proximity)
+    risk = np.round(np.clip(static[None, :] + w_pl * proximity, 0, 1), 4)
+
+    mean_before = baseline.mean()
+    extreme_before = int((baseline > 0.75).sum())
+    mean_risk = risk.mean(axis=1)
+    extreme = (risk > 0.75).sum(axis=1)
+
+    return {
+        "risk": risk.astype(np.float32),
+        "mean_risk": mean_risk,
+        "extreme_cells": extreme,
+        "high_risk_cells": (risk > 0.55).sum(axis=1),
+        "reduction_pct": (mean_before - mean_risk) / mean_before * 100 if mean_before > 0 else np.zeros(len(risk)),
+        "extreme_cells_eliminated": extreme_before - extreme,
+    }
+
+
+def annotate_plans_with_terrain_risk(
+    plans: list[dict],
+    terrain_df: pd.DataFrame,
+    basis,
+    weather: dict = None,
+    rerank: bool = False,
+) -> list[dict]:
+    """
+    Add terrain-level risk reduction to optimizer plans with one batched call.
+
+    Each plan gains 'terrain_risk_reduction_pct' and
+    'extreme_cells_eliminated'. With rerank=True, plans are re-sorted by
+    terrain risk reduction and their 'rank' is reassigned.
+    """
+    if not plans:
+        return plans
+
+    batch = compute_batch_ignition_risk(
+        terrain_df, basis, [plan["lines_disabled"] for plan in plans], weather,
+    )
+    for plan, pct, eliminated in zip(plans, batch["reduction_pct"], batch["extreme_cells_eliminated"]):
+        plan["terrain_risk_reduction_pct"] = round(float(pct), 2)
+        plan["extreme_cells_eliminated"] = int(eliminated)
+
+    if rerank:
+        plans.sort(key=lambda p: p["terrain_risk_reduction_pct"], reverse=True)
+        for i, plan in enumerate(plans):
+            plan["rank"] = i + 1
+
+    return plans
+
+
+class IncrementalRiskUpdater:
+    """
+    Patches a compute_ignition_risk result in place when lines toggle.
+
+    Tracks which line gives each cell its max proximity. Disabling a line
+    only dirties the cells it was the argmax for; enabling one only dirties
+    cells where it beats the current max. Only dirty cells are recomputed.
+    """
+
+    def __init__(self, risk_df: pd.DataFrame, basis, weather: dict = None, active_line_ids=None):
+        """
+        Args:
+            risk_df: compute_ignition_risk output for the active lines (patched in place)
+            basis: data_generator.ProximityBasis for this terrain and line set
+            weather: Weather dict risk_df was computed with (defaults to config WEATHER)
+            active_line_ids: Lines energized in risk_df (defaults to all lines)
+        """
+        self.df = risk_df
+        self.basis = basis
+        self.static = _static_risk(risk_df, weather or WEATHER)
+        self.active = basis.line_mask(basis.line_ids if active_line_ids is None else active_line_ids)
+        self.proximity, self.argmax = self._masked_max(slice(None), self.active)
+
+    def _masked_max(self, rows, active: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Max proximity and contributing line index (-1 if none) for the given rows."""
+        masked = np.where(active[None, :], self.basis.matrix[rows], -1.0)
+        if masked.shape[1] == 0:
+            return np.zeros(masked.shape[0]), np.full(masked.shape[0], -1)
+        argmax = masked.argmax(axis=1)
+        proximity = np.maximum(masked[np.arange(len(argmax)), argmax], 0.0)
+        return proximity, np.where(proximity > 0, argmax, -1)
+
+    def update(self, disabled_lines) -> int:
+        """
+        Re-energize/disable lines to match disabled_lines and patch the
+        ignition_risk, risk_category, risk_color_* and risk_height columns.
+
+        Returns:
+            Number of cells whose ignition risk changed
+        """
+        new_active = ~self.basis.line_mask(disabled_lines)
+        turned_off = np.flatnonzero(self.active & ~new_active)
+        turned_on = ~self.active & new_active
+
+        dirty = np.isin(self.argmax, turned_off)
+        if turned_on.any():
+            dirty |= (self.basis.matrix[:, turned_on] > self.proximity[:, None]).any(axis=1)
+        self.active = new_active
+
+        rows = np.flatnonzero(dirty)
+        if rows.size == 0:
+            return 0
+
+        proximity, argmax = self._masked_max(rows, new_active)
+        self.proximity[rows] = proximity
+        self.argmax[rows] = argmax
+
+        risk = np.round(np.clip(
+            self.static[rows] + RISK_WEIGHTS["powerline_proximity"] * proximity, 0, 1,
+        ), 4)
+        old = self.df["ignition_risk"].to_numpy()[rows]
+        changed = risk != old
+        rows, risk = rows[changed], risk[changed]
+        if rows.size == 0:
+            return 0
+
+        category, colors, height = risk_style(risk)
+        cols = self.df.columns
+        self.df.iloc[rows, cols.get_loc("ignition_risk")] = risk
+        self.df.iloc[rows, cols.get_loc("risk_category")] = np.asarray(category, dtype=object)
+        for k, col in enumerate(RISK_COLOR_COLUMNS):
+            self.df.iloc[rows, cols.get_loc(col)] = colors[:, k]
+        self.df.iloc[rows, cols.get_loc("risk_height")] = height
+
+        return int(rows.size)
+
+
+def compute_risk_timeseries(
+    terrain_df: pd.DataFrame,
+    weather_timeline: pd.DataFrame,
+    powerline_proximity: np.ndarray,
+) -> tuple[np.ndarray, pd.DataFrame]:
+    """
+    Ignition risk for every forecast hour in one broadcast pass.
+
+    Each row matches what compute_ignition_risk would return for that
+    hour's weather, without per-hour DataFrame copies.
+
+    Args:
+        terrain_df: Terrain grid with fuel/slope/exposure data
+        weather_timeline: Hourly forecast (generate_weather_timeline)
+        powerline_proximity: Array of proximity scores to active power lines
+
+    Returns:
+        (risk, hourly) — an hours × cells float32 risk array, and a
+        DataFrame with per-hour 'mean_risk', 'max_risk', 'extreme_cells'
+        and 'high_cells' (0.55 < risk <= 0.75)
+    """
+    wx = {
+        "wind_speed_mph": weather_timeline["wind_speed_mph"].to_numpy(dtype=float)[:, None],
+        "humidity_pct": weather_timeline["humidity_pct"].to_numpy(dtype=float)[:, None],
+    }
+    risk = _static_risk(terrain_df, wx)
+    risk += RISK_WEIGHTS["powerline_proximity"] * powerline_proximity[None, :]
+    risk = np.round(np.clip(risk, 0, 1, out=risk), 4).astype(np.float32)
+
+    hourly = pd.DataFrame({
+        "hour": weather_timeline["hour"].to_numpy() if "hour" in weather_timeline else np.arange(len(risk)),
+        "mean_risk": risk.mean(axis=1, dtype=np.float64),
+        "max_risk": risk.max(axis=1),
+        "extreme_cells": (risk > 0.75).sum(axis=1),
+        "high_cells": ((risk > 0.55) & (risk <= 0.75)).sum(axis=1),
+    })
+
+    return risk, hourly
+
+
+def compute_corridor_risk(
+    terrain_df: pd.DataFrame,
+    corridor_index,
+    weather: dict = None,
+    percentile: float = 90,
+) -> dict:
+    """
+    Terrain ignition risk aggregated along every power line corridor.
+
+    Cell risk is the ignition index without the power line proximity term
+    (the line's own contribution would otherwise score itself), clipped to
+    0-1. Only that per-cell pass depends on the weather; the aggregation is
+    a gather over the precomputed corridor index.
+
+    Args:
+        terrain_df: Terrain grid the index was built on
+        corridor_index: data_generator.LineCorridorIndex
+        weather: Weather dict override (defaults to config WEATHER)
+        percentile: Upper percentile reported alongside max and mean
+
+    Returns:
+        LineCorridorIndex.aggregate output ('max', 'mean', 'p90', 'cells'
+        arrays, one entry per corridor_index.line_ids)
+    """
+    cell_risk = np.clip(_static_risk(terrain_df, weather or WEATHER), 0, 1)
+    return corridor_index.aggregate(cell_risk, percentile)
+
+
+def summarize_risk(ignition_risk: np.ndarray) -> dict:
+    """
+    Additive risk summary for a block of cells (category counts, sum, max).
+
+    Summaries from separate tiles combine with combine_risk_summaries.
+    """
+    r = np.asarray(ignition_risk)
+    return {
+        "total_cells": int(r.size),
+        "extreme_cells": int((r > 0.75).sum()),
+        "high_cells": int(((r > 0.55) & (r <= 0.75)).sum()),
+        "moderate_cells": int(((r > 0.3) & (r <= 0.55)).sum()),
+        "low_cells": int((r <= 0.3).sum()),
+        "risk_sum": float(r.sum(dtype=np.float64)),
+        "max_risk": float(r.max()) if r.size else 0.0,
+    }
+
+
+def combine_risk_summaries(summaries) -> dict:
+    """
+    Reduce per-tile summaries into global stats, adding 'mean_risk'.
+    """
+    total = {
+        "total_cells": 0, "extreme_cells": 0, "high_cells": 0,
+        "moderate_cells": 0, "low_cells": 0, "risk_sum": 0.0, "max_risk": 0.0,
+    }
+    for s in summaries:
+        for key in ("total_cells", "extreme_cells", "high_cells", "moderate_cells", "low_cells", "risk_sum"):
+            total[key] += s[key]
+        total["max_risk"] = max(total["max_risk"], s["max_risk"])
+    total["mean_risk"] = total["risk_sum"] / total["total_cells"] if total["total_cells"] else 0.0
+    return total
+
+
+def iter_risk_tiles(
+    terrain_tiles,
+    powerlines_df: pd.DataFrame,
+    weather: dict = None,
+    proximity_method: str = "midpoint",
+):
+    """
+    Compute ignition risk tile by tile over a stream of terrain tiles.
+
+    Only one tile's arrays are alive at a time. The random perturbation is
+    seeded per tile from its first global cell index, so results do not
+    depend on how the region is traversed.
+
+    Args:
+        terrain_tiles: Iterable of terrain DataFrames (e.g. iter_terrain_tiles)
+        powerlines_df: Power lines (rows with active=False are skipped)
+        weather: Weather dict override (defaults to config WEATHER)
+        proximity_method: "midpoint" or "segment" (see compute_powerline_proximity)
+
+    Yields:
+        Dicts with 'grid_i', 'grid_j', 'lat', 'lon' and float32
+        'ignition_risk' arrays, plus the tile's 'summary'
+    """
+    wx = weather or WEATHER
+    for tile in terrain_tiles:
+        grid_i = tile["grid_i"].to_numpy()
+        grid_j = tile["grid_j"].to_numpy()
+        seed = [42, int(grid_i[0]), int(grid_j[0])] if len(tile) else 42
+
+        proximity = compute_powerline_proximity(tile, powerlines_df, method=proximity_method)
+        risk = np.clip(
+            _static_risk(tile, wx, noise_seed=seed) + RISK_WEIGHTS["powerline_proximity"] * proximity, 0, 1,
+        )
+        risk = np.round(risk, 4).astype(np.float32)
+
+        yield {
+            "grid_i": grid_i,
+            "grid_j": grid_j,
+            "lat": tile["lat"].to_numpy(),
+            "lon": tile["lon"].to_numpy(),
+            "ignition_risk": risk,
+            "summary": summarize_risk(risk),
+        }
+
+
+# ─── Raster Fire Spread ─────────────────────────────────────────────────────
+BASE_ROS_M_PER_H = 1200.0       # head-fire spread in full, bone-dry fuel, no wind
+MOISTURE_OF_EXTINCTION = 0.25   # fuel moisture at which fire stops spreading
+SLOPE_FACTOR = 5.275            # Rothermel slope coefficient (φs = 5.275·tan²θ)
+METERS_PER_DEG_LAT = 110540.0
+METERS_PER_DEG_LON_EQUATOR = 111320.0
+
+# 16-neighbour stencil (knight moves included) to limit raster direction bias
+_SPREAD_OFFSETS = [
+    (di, dj)
+    for di in range(-2, 3) for dj in range(-2, 3)
+    if (di, dj) != (0, 0) and max(abs(di), abs(dj)) <= 2 and np.gcd(di, dj) == 1
+]
+
+
+def compute_spread_rates(terrain_df: pd.DataFrame, weather: dict = None) -> dict:
+    """
+    Per-cell fire spread parameters from fuel, moisture and wind.
+
+    Rothermel-inspired: R0 = BASE_ROS · fuel_density · moisture damping ·
+    humidity factor. Local wind is the weather wind scaled by the cell's
+    wind_exposure; it sets the wind factor φw = (U/20)^1.3 and the
+    eccentricity of the spread ellipse (as in compute_fire_spread_cone).
+
+    Returns:
+        Dict of per-cell arrays 'r0' (m/h), 'phi_wind' and 'eccentricity'
+    """
+    wx = weather or WEATHER
+    damping = np.clip(1.0 - terrain_df["fuel_moisture"].to_numpy(dtype=float) / MOISTURE_OF_EXTINCTION, 0, 1)
+    humidity_factor = 1.0 + (1.0 - wx["humidity_pct"] / 100) * 0.5
+    r0 = BASE_ROS_M_PER_H * terrain_df["fuel_density"].to_numpy(dtype=float) * damping * humidity_factor
+
+    wind = wx["wind_speed_mph"] * terrain_df["wind_exposure"].to_numpy(dtype=float)
+    return {
+        "r0": r0,
+        "phi_wind": (wind / 20) ** 1.3,
+        "eccentricity": np.minimum(0.9, wind / 60),
+    }
+
+
+def compute_fire_arrival_times(
+    terrain_df: pd.DataFrame,
+    ignition_lat: float,
+    ignition_lon: float,
+    weather: dict = None,
+) -> np.ndarray:
+    """
+    Fire arrival time (hours) at every terrain cell by minimum travel time.
+
+    Cells are linked to their 16-neighbour stencil on the grid_i/grid_j
+    raster. The spread rate from a cell in bearing θ is
+
+        R(θ) = R0 · [(1 + φw)(1 − e) / (1 − e·cos(θ − θ_wind)) + φs]
+
+    with φs = SLOPE_FACTOR · tan² of the upslope grade along the move (0
+    downslope). Crossing an edge takes half its length at each end cell's
+    rate. One Dijkstra pass from the cell nearest the ignition point then
+    gives every arrival time, so any number of isochrones share one solve.
+    The head fire runs toward wind_direction_deg, matching the wind field
+    and cone conventions.
+
+    Returns:
+        Arrival hours aligned with terrain_df rows (inf where fire never arrives)
+    """
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import dijkstra
+
+    wx = weather or WEATHER
+    n = len(terrain_df)
+    if n == 0:
+        return np.zeros(0)
+
+    lat = terrain_df["lat"].to_numpy(dtype=float)
+    lon = terrain_df["lon"].to_numpy(dtype=float)
+    elevation = terrain_df["elevation"].to_numpy(dtype=float)
+    gi = terrain_df["grid_i"].to_numpy(dtype=np.int64)
+    gj = terrain_df["grid_j"].to_numpy(dtype=np.int64)
+    gi, gj = gi - gi.min(), gj - gj.min()
+    cell_at = np.full((gi.max() + 1, gj.max() + 1), -1, dtype=np.int64)
+    cell_at[gi, gj] = np.arange(n)
+
+    rates = compute_spread_rates(terrain_df, wx)
+    head = np.radians(wx["wind_direction_deg"])
+    lon_scale = METERS_PER_DEG_LON_EQUATOR * np.cos(np.radians(lat.mean()))
+
+    def directional_rate(cells, bearing, grade):
+        e = rates["eccentricity"][cells]
+        wind_term = (1 + rates["phi_wind"][cells]) * (1 - e) / (1 - e * np.cos(bearing - head))
+        return rates["r0"][cells] * (wind_term + SLOPE_FACTOR * np.maximum(grade, 0) ** 2)
+
+    src, dst, hours = [], [], []
+    for di, dj in _SPREAD_OFFSETS:
+        ti, tj = gi + di, gj + dj
+        inside = (ti >= 0) & (ti < cell_at.shape[0]) & (tj >= 0) & (tj < cell_at.shape[1])
+        a = np.flatnonzero(inside)
+        b = cell_at[ti[a], tj[a]]
+        a, b = a[b >= 0], b[b >= 0]
+
+        dy = (lat[b] - lat[a]) * METERS_PER_DEG_LAT
+        dx = (lon[b] - lon[a]) * lon_scale
+        length = np.hypot(dx, dy)
+        bearing = np.arctan2(dx, dy)
+        grade = (elevation[b] - elevation[a]) / length
+        with np.errstate(divide="ignore"):
+            time = length / 2 * (
+                1 / directional_rate(a, bearing, grade) + 1 / directional_rate(b, bearing, grade)
+            )
+        ok = np.isfinite(time)
+        src.append(a[ok])
+        dst.append(b[ok])
+        hours.append(time[ok])
+
+    graph = csr_matrix((np.concatenate(hours), (np.concatenate(src), np.concatenate(dst))), shape=(n, n))
+    origin = int(np.argmin(np.hypot((lat - ignition_lat) * METERS_PER_DEG_LAT, (lon - ignition_lon) * lon_scale)))
+    return dijkstra(graph, directed=True, indices=origin)
+
+
+def fire_spread_isochrones(
+    terrain_df: pd.DataFrame,
+    arrival_hours: np.ndarray,
+    ignition_lat: float,
+    ignition_lon: float,
+    hours_list: list,
+    n_sectors: int = 36,
+) -> list[list]:
+    """
+    Burned-area outline for each horizon from one arrival-time field.
+
+    Around the ignition point, each of n_sectors bearing sectors reaches as
+    far as the farthest cell burning by that horizon (at least half a grid
+    step). All horizons come out of a single pass over the cells.
+
+    Returns:
+        One closed [lon, lat] polygon per entry of hours_list
+    """
+    lat = terrain_df["lat"].to_numpy(dtype=float)
+    lon = terrain_df["lon"].to_numpy(dtype=float)
+    lon_scale = np.cos(np.radians(ignition_lat))
+    north = lat - ignition_lat
+    east = (lon - ignition_lon) * lon_scale
+    distance = np.hypot(north, east)
+    sector = (np.floor(np.mod(np.arctan2(east, north), 2 * np.pi) / (2 * np.pi) * n_sectors)).astype(np.int64) % n_sectors
+
+    horizons = np.asarray(hours_list, dtype=float)
+    reach = np.full((len(horizons), n_sectors), GRID_STEP_LAT / 2)
+    burning = np.asarray(arrival_hours)[None, :] <= horizons[:, None]          # (horizons, cells)
+    h_idx, cells = np.nonzero(burning)
+    np.maximum.at(reach, (h_idx, sector[cells]), distance[cells] + GRID_STEP_LAT / 2)
+
+    angles = (np.arange(n_sectors) + 0.5) * 2 * np.pi / n_sectors
+    polygons = []
+    for radius in reach:
+        points = [
+            [round(float(ignition_lon + r * np.sin(a) / lon_scale), 6), round(float(ignition_lat + r * np.cos(a)), 6)]
+            for r, a in zip(radius, angles)
+        ]
+        points.append(points[0])
+        polygons.append(points)
+    return polygons
+
+
 def compute_fire_spread_cone(
     ignition_lat: float,
     ignition_lon: float,
@@ -129,11 +632,17 @@ def compute_fire_spread_cone(
         ignition_lat, ignition_lon: Ignition point coordinates
         weather: Weather conditions
         hours: Hours of spread to project
-        terrain_df: Terrain data for slope effects
+        terrain_df: Terrain grid; if given, the outline is the isochrone
+            of a raster spread solve (compute_fire_arrival_times) instead
+            of the analytic cone
 
     Returns:
         List of polygon coordinate dicts for visualization
     """
+    if terrain_df is not None:
+        arrival = compute_fire_arrival_times(terrain_df, ignition_lat, ignition_lon, weather)
+        return fire_spread_isochrones(terrain_df, arrival, ignition_lat, ignition_lon, [hours])[0]
+
     wx = weather or WEATHER
 
     # Base spread rate (chains/hour → approximate degrees of lat/lon)
@@ -181,10 +690,15 @@ def compute_multiple_spread_scenarios(
     ignition_lon: float,
     weather: dict = None,
     hours_list: list = None,
+    terrain_df: pd.DataFrame = None,
 ) -> list[dict]:
     """
     Compute spread cones for multiple time horizons (ensemble visualization).
 
+    With terrain_df, every horizon is an isochrone of one raster
+    minimum-travel-time solve (compute_fire_arrival_times); without it,
+    each horizon is an analytic cone.
+
     Returns:
         List of dicts with 'hours', 'polygon', 'color', 'opacity'
     """
@@ -198,11 +712,17 @@ def compute_multiple_spread_scenarios(
         [136, 14, 79, 60],    # 24h - dark
     ]
 
+    if terrain_df is not None:
+        arrival = compute_fire_arrival_times(terrain_df, ignition_lat, ignition_lon, weather)
+        polygons = fire_spread_isochrones(terrain_df, arrival, ignition_lat, ignition_lon, hours_list)
+    else:
+        polygons = [
+            compute_fire_spread_cone(ignition_lat, ignition_lon, weather, hours)
+            for hours in hours_list
+        ]
+
     scenarios = []
-    for i, hours in enumerate(hours_list):
-        polygon = compute_fire_spread_cone(
-            ignition_lat, ignition_lon, weather, hours,
-        )
+    for i, (hours, polygon) in enumerate(zip(hours_list, polygons)):
         scenarios.append({
             "hours": hours,
             "polygon": [polygon],  # GeoJSON expects nested
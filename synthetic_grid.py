@@ -0,0 +1,273 @@
+"""
+EarthDial v3 — Synthetic Grid Generator & Scaling Benchmark
+Reproducible radial-plus-mesh distribution networks with thousands of
+substations, lines and facilities (line ratings N-1 secure under DC flow),
+and a harness that times GridOptimizer as the grid grows.
+"""
+
+import time
+import numpy as np
+import pandas as pd
+from config import CENTER_LAT, CENTER_LON, FACILITY_ICONS, WEATHER
+
+NODE_SPACING_DEG = 0.01      # ~1 km between neighboring substations
+LINE_RATING_MW = {230: 400, 115: 150, 60: 60}
+RATING_HEADROOM = 1.2        # rating ≥ 1.2 × worst flow over the base case and N-1
+
+
+def generate_synthetic_grid(
+    n_substations: int = 1000,
+    n_sources: int = None,
+    mesh_ratio: float = 0.1,
+    facility_ratio: float = 0.3,
+    seed: int = 0,
+    center_lat: float = CENTER_LAT,
+    center_lon: float = CENTER_LON,
+) -> tuple[list[dict], list[dict], list[dict]]:
+    """
+    Generate a synthetic distribution grid in the config.py schema.
+
+    Source substations are tied together by a 230 kV trunk (minimum spanning
+    tree). Every other substation joins the feeder of its nearest source and
+    hangs off the nearest substation already placed closer to that source,
+    which gives radial feeders (115 kV off the source, 60 kV laterals).
+    mesh_ratio · n_substations 60 kV tie lines then close loops between
+    nearby substations. Line ratings are the nominal rating for the voltage,
+    raised where needed to RATING_HEADROOM × the worst DC flow the line
+    carries in the base case or after any single line outage, so the grid
+    is N-1 secure and overload screening only rejects multi-line plans
+    that genuinely overload it.
+
+    Args:
+        n_substations: Total substations (sources included)
+        n_sources: Source substations (default: one per 100, at least 2)
+        mesh_ratio: Tie lines added per substation
+        facility_ratio: Critical facilities per substation
+        seed: Random seed; equal seeds give identical grids
+
+    Returns:
+        (substations, power_lines, critical_facilities) lists of dicts
+    """
+    import networkx as nx
+    from scipy.spatial import cKDTree
+
+    rng = np.random.default_rng(seed)
+    n = max(2, n_substations)
+    n_sources = min(n, n_sources or max(2, n // 100))
+    extent = NODE_SPACING_DEG * np.sqrt(n) / 2
+    lat = center_lat + rng.uniform(-extent, extent, n)
+    lon = center_lon + rng.uniform(-extent, extent, n)
+    xy = np.column_stack([lat, lon])
+    width = len(str(n))
+
+    sources = rng.choice(n, n_sources, replace=False)
+    is_source = np.zeros(n, dtype=bool)
+    is_source[sources] = True
+    load = np.where(is_source, 0.0, rng.uniform(2.0, 15.0, n)).round(1)
+
+    sub_id = [f"SYN-SUB-{i:0{width}d}" for i in range(n)]
+    edges = []  # (a, b, voltage_kv)
+
+    # Transmission trunk between sources
+    trunk = nx.Graph()
+    for i, a in enumerate(sources):
+        for b in sources[i + 1:]:
+            trunk.add_edge(int(a), int(b), weight=float(np.hypot(*(xy[a] - xy[b]))))
+    edges += [(a, b, 230) for a, b in nx.minimum_spanning_edges(trunk, data=False)]
+
+    # Radial feeders: each substation hangs off the nearest placed node on its way to the source
+    feeder = sources[cKDTree(xy[sources]).query(xy)[1]]
+    for src in sources:
+        members = np.flatnonzero((feeder == src) & ~is_source)
+        members = members[np.argsort(np.hypot(*(xy[members] - xy[src]).T))]
+        placed = [int(src)]
+        for node in members:
+            placed_xy = xy[placed]
+            parent = placed[int(np.argmin(np.hypot(*(placed_xy - xy[node]).T)))]
+            edges.append((parent, int(node), 115 if parent == src else 60))
+            placed.append(int(node))
+
+    # Mesh: tie lines to the nearest substation not already adjacent
+    adjacent = {(min(a, b), max(a, b)) for a, b, _ in edges}
+    tree = cKDTree(xy)
+    for node in rng.choice(n, int(round(mesh_ratio * n)), replace=True):
+        for other in tree.query(xy[node], k=min(n, 8))[1][1:]:
+            pair = (min(node, other), max(node, other))
+            if pair not in adjacent:
+                adjacent.add(pair)
+                edges.append((int(node), int(other), 60))
+                break
+
+    # Sources carry their feeder's load with headroom; others twice their own
+    feeder_load = pd.Series(load).groupby(feeder).sum()
+    capacity = np.where(is_source, 0.0, load * 2)
+    capacity[sources] = np.maximum(50.0, feeder_load.reindex(sources).fillna(0).to_numpy() * 1.3)
+    substations = [
+        {
+            "id": sub_id[i],
+            "name": f"Synthetic Substation {i}",
+            "lat": round(float(lat[i]), 6),
+            "lon": round(float(lon[i]), 6),
+            "capacity_mw": round(float(capacity[i]), 1),
+            "load_mw": float(load[i]),
+            "source": bool(is_source[i]),
+        }
+        for i in range(n)
+    ]
+
+    line_width = len(str(len(edges)))
+    power_lines = [
+        {
+            "id": f"SYN-PL-{e:0{line_width}d}",
+            "name": f"{sub_id[a]}–{sub_id[b]} {kv}kV",
+            "from": sub_id[a],
+            "to": sub_id[b],
+            "voltage_kv": kv,
+            "vegetation_risk": round(float(rng.beta(2, 2)), 2),
+            "age_years": int(rng.integers(5, 60)),
+            "customers": int(rng.integers(200, 8000)),
+            "rating_mw": LINE_RATING_MW[kv],
+        }
+        for e, (a, b, kv) in enumerate(edges)
+    ]
+
+    # Size ratings from the worst base-case or single-outage DC flow (N-1 secure)
+    from power_flow import DCPowerFlow
+    model = DCPowerFlow(
+        {s["id"]: s for s in substations},
+        {pl["id"]: pl for pl in power_lines},
+        {sub_id[i] for i in sources},
+    )
+    worst = np.abs(model.base_flow)
+    chunk = 1024
+    for start in range(0, len(model.line_ids), chunk):
+        flows, _ = model.outage_flows([[pl_id] for pl_id in model.line_ids[start:start + chunk]], chunk)
+        worst = np.maximum(worst, np.abs(flows).max(axis=0))
+    for pl, flow in zip(power_lines, worst):
+        pl["rating_mw"] = max(pl["rating_mw"], float(np.ceil(RATING_HEADROOM * flow)))
+
+    n_fac = int(round(facility_ratio * n))
+    fac_width = len(str(max(n_fac, 1)))
+    types = list(FACILITY_ICONS)
+    hosts = rng.choice(n, n_fac, replace=True)
+    critical_facilities = [
+        {
+            "id": f"SYN-CF-{j:0{fac_width}d}",
+            "name": f"Synthetic {t} {j}",
+            "type": t,
+            "lat": round(float(lat[h] + rng.normal(0, 0.001)), 6),
+            "lon": round(float(lon[h] + rng.normal(0, 0.001)), 6),
+            "substation": sub_id[h],
+            "priority": int(p),
+        }
+        for j, (h, t, p) in enumerate(zip(
+            hosts,
+            rng.choice(types, n_fac),
+            rng.choice([1, 2, 3], n_fac, p=[0.4, 0.35, 0.25]),
+        ))
+    ]
+
+    return substations, power_lines, critical_facilities
+
+
+def _best_time(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark_scaling(
+    sizes: tuple = (100, 300, 1000, 3000),
+    seed: int = 0,
+    repeats: int = 3,
+    max_shutoffs: int = 2,
+    top_k: int = 10,
+    weather: dict = None,
+) -> pd.DataFrame:
+    """
+    Time the GridOptimizer hot paths on synthetic grids of growing size.
+
+    Memoized results are cleared before every run, so each timing is a
+    cold call. optimize_shutoffs uses the "search" solver with
+    protect_critical=True.
+
+    Returns:
+        One row per (size, operation): n_substations, n_lines,
+        n_facilities, operation and best-of-repeats seconds
+    """
+    import networkx as nx
+    from grid_optimizer import GridOptimizer
+
+    weather = weather or WEATHER
+    rows = []
+    for size in sizes:
+        substations, lines, facilities = generate_synthetic_grid(size, seed=seed)
+        optimizer = GridOptimizer(substations, lines, facilities)
+        rng = np.random.default_rng(seed)
+        disabled = set(rng.choice(list(optimizer.power_lines), max(1, len(lines) // 100), replace=False))
+
+        def build_graph():
+            optimizer.graph = nx.Graph()
+            optimizer.edge_index = {}
+            optimizer._build_graph()
+
+        def line_scores():
+            optimizer._line_score_cache.clear()
+            optimizer.compute_line_risk_scores(weather)
+
+        def shutoffs():
+            optimizer._line_score_cache.clear()
+            optimizer._plan_cache.clear()
+            optimizer.optimize_shutoffs(weather, max_shutoffs=max_shutoffs, top_k=top_k)
+
+        timings = {
+            "_build_graph": build_graph,
+            "check_grid_connectivity": lambda: optimizer.check_grid_connectivity(disabled),
+            "compute_line_risk_scores": line_scores,
+            "optimize_shutoffs": shutoffs,
+        }
+        for operation, fn in timings.items():
+            rows.append({
+                "n_substations": size,
+                "n_lines": len(lines),
+                "n_facilities": len(facilities),
+                "operation": operation,
+                "seconds": _best_time(fn, repeats),
+            })
+
+    return pd.DataFrame(rows)
+
+
+def scaling_exponents(results: pd.DataFrame) -> dict:
+    """
+    Empirical complexity per operation: the slope of log(seconds) against
+    log(n_lines). ~1 is linear, ~2 quadratic.
+    """
+    exponents = {}
+    for operation, group in results.groupby("operation", sort=False):
+        if len(group) < 2:
+            continue
+        slope = np.polyfit(np.log(group["n_lines"]), np.log(np.maximum(group["seconds"], 1e-9)), 1)[0]
+        exponents[operation] = round(float(slope), 2)
+    return exponents
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="GridOptimizer scaling benchmark on synthetic grids")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 300, 1000, 3000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--max-shutoffs", type=int, default=2)
+    args = parser.parse_args()
+
+    results = benchmark_scaling(args.sizes, args.seed, args.repeats, args.max_shutoffs)
+    table = results.pivot(index=["n_substations", "n_lines", "n_facilities"], columns="operation", values="seconds")
+    print(table.to_string(float_format=lambda s: f"{s * 1000:10.2f} ms"))
+    print()
+    for operation, slope in scaling_exponents(results).items():
+        print(f"{operation:<26} ~ O(n^{slope})")
@@ -11,6 +11,7 @@ from config import (
     CENTER_LAT, CENTER_LON, MAP_ZOOM, MAP_PITCH, MAP_BEARING,
     COLORS, FACILITY_ICONS,
 )
+from risk_engine import RISK_COLOR_COLUMNS
 
 
 def get_view_state(lat=CENTER_LAT, lon=CENTER_LON, zoom=MAP_ZOOM, pitch=MAP_PITCH, bearing=MAP_BEARING):
@@ -31,7 +32,7 @@ def create_risk_column_layer(terrain_df: pd.DataFrame) -> pdk.Layer:
     3D columns showing ignition risk — the signature EarthDial visual.
     Height = risk level, Color = risk severity.
     """
-    data = terrain_df[["lat", "lon", "ignition_risk", "risk_height", "risk_color"]].copy()
+    data = terrain_df[["lat", "lon", "ignition_risk", "risk_height", *RISK_COLOR_COLUMNS]].copy()
     data = data[data["ignition_risk"] > 0.2]  # Only show meaningful risk
 
     return pdk.Layer(
@@ -41,7 +42,7 @@ def create_risk_column_layer(terrain_df: pd.DataFrame) -> pdk.Layer:
         get_elevation="risk_height",
         elevation_scale=1,
         radius=150,
-        get_fill_color="risk_color",
+        get_fill_color=f"[{', '.join(RISK_COLOR_COLUMNS)}]",
         pickable=True,
         auto_highlight=True,
         coverage=0.85,